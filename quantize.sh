@@ -0,0 +1,35 @@
+#!/bin/bash
+set -e
+
+# Re-quantize a GGUF model for the bundled summarizer.
+#
+# The default model OpenMeet ships (Llama-3.2-3B-Instruct-Q4_K_M.gguf)
+# is already Q4_K_M - decode on both CPU and Metal is memory-bandwidth
+# bound, so 4-bit weights roughly double tokens/s over Q8_0 and ~4x
+# over FP16. Use this script if you drop in your own model and it is
+# not quantized yet.
+#
+# Usage: ./quantize.sh input.gguf [Q4_K_M|Q5_K_S]
+#
+# Requires llama-quantize from llama.cpp (brew install llama.cpp, or
+# build from source).
+
+INPUT="$1"
+QUANT="${2:-Q4_K_M}"
+
+if [[ -z "$INPUT" || ! -f "$INPUT" ]]; then
+    echo "Usage: $0 input.gguf [Q4_K_M|Q5_K_S]"
+    exit 1
+fi
+
+if ! command -v llama-quantize &> /dev/null; then
+    echo "❌ llama-quantize not found (brew install llama.cpp)"
+    exit 1
+fi
+
+OUTPUT="${INPUT%.gguf}-${QUANT}.gguf"
+
+echo "Quantizing $INPUT -> $OUTPUT ($QUANT)..."
+llama-quantize "$INPUT" "$OUTPUT" "$QUANT"
+
+echo "✅ Done. Point llm_model in settings at $(basename "$OUTPUT")"
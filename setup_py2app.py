@@ -1,6 +1,7 @@
 """
 py2app setup script for OpenMeet
 Build with: python setup_py2app.py py2app
+Dev builds: python setup_py2app.py py2app -A   (alias build, links to source)
 """
 import sys
 sys.setrecursionlimit(10000)  # torch's deep AST tree needs this
@@ -82,11 +83,37 @@ OPTIONS = {
         'pyannote.pipeline',
         'pyannote.database',
         'pyannote.metrics',
+        # torch subpackages diarization never touches — every bundled .so
+        # is another dlopen at launch, so prune aggressively. NOT on the
+        # list: torch.cuda (torch/__init__.py imports it unconditionally)
+        # and scipy.sparse.csgraph (imported by sklearn.cluster, which
+        # pyannote's clustering uses). Smoke-test the built .app — launch
+        # it and run a diarized recording — before trimming further.
+        'torch.distributions',
+        'torch.distributed',
+        'torch.testing',
+        'torch.onnx',
+        'torch.jit.mobile',
+        'torch.utils.tensorboard',
+        'torch.utils.benchmark',
+        'torch.fx.experimental',
+        'torch.ao.quantization',
+        'torch.profiler',
+        'torch._inductor',
+        'torch._dynamo',
+        # unused corners of sklearn/scipy pulled in by pyannote deps
+        'sklearn.datasets',
+        'scipy.io.matlab',
     ],
     'semi_standalone': False,
-    'site_packages': True,
+    # Only bundle what modulefinder actually reaches - copying all of
+    # site-packages multiplies the mach-o files dyld must map at launch
+    'site_packages': False,
+    'compressed': True,
+    # Nothing links system frameworks directly; stop py2app scanning for them
+    'frameworks': [],
     'strip': True,
-    'optimize': 1,
+    'optimize': 2,
 }
 
 setup(
@@ -5,18 +5,20 @@ Real-time meeting transcription and AI summaries
 import rumps
 import sys
 import os
+import subprocess
+import wave
 from pathlib import Path
 import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import logging
 
 if not getattr(sys, 'frozen', False):
     sys.path.insert(0, str(Path(__file__).parent))
 
-from utils.config import validate_setup, settings
+from utils.config import validate_setup, settings, CHUNK_DURATION, TRANSCRIPTS_DIR
 from audio_capture import AudioCapture
-from transcriber import Transcriber
-from summarizer import Summarizer
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +35,24 @@ ICON_DEFAULT = str(ASSETS_DIR / "openmeet_menu.png")
 ICON_RECORDING = str(ASSETS_DIR / "openmeet_meeting.png")
 ICON_PROCESSING = str(ASSETS_DIR / "openmeet_speechbubble.png")
 
+# Characters of transcript kept for the quick preview in Show Transcript
+TRANSCRIPT_PREVIEW_CHARS = 500
+
+# Menu title frames shown while the summary is streaming
+SPINNER_FRAMES = ("◐", "◓", "◑", "◒")
+
+
+def _spawn_open(path, text_editor=False):
+    """Launch Finder/TextEdit on a path without blocking the main thread."""
+    cmd = ["open", "-t", str(path)] if text_editor else ["open", str(path)]
+    subprocess.Popen(
+        cmd,
+        close_fds=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
 
 class OpenMeetApp(rumps.App):
     """Main menu bar application"""
@@ -57,32 +77,24 @@ class OpenMeetApp(rumps.App):
         # State
         self.is_recording = False
         self.transcript_window = None
-        self.full_transcript = []
+        self.full_transcript = deque()
+        # The transcription worker appends while the main thread reads;
+        # keep the critical sections short and copy before formatting
+        self._transcript_lock = threading.Lock()
 
         # Audio capture
         self.audio_capture = AudioCapture()
         self.recording_thread = None
 
-        # Transcriber
-        self.transcriber = Transcriber()
+        # Heavy components (whisper, llama_cpp, pyannote) are lazy-loaded
+        # on first use so the menu bar icon appears instantly
+        self._model_load_lock = threading.Lock()
+        self.transcriber = None
         self.transcription_thread = None
-
-        # Summarizer
-        try:
-            self.summarizer = Summarizer()
-        except RuntimeError:
-            logger.warning("Summarizer not available (model not found)")
-            self.summarizer = None
-
-        # Diarizer (lazy, only if enabled)
+        self.summarizer = None
+        self._summarizer_failed = False
         self.diarizer = None
-        if settings.get("diarization_enabled"):
-            try:
-                from diarizer import Diarizer
-                self.diarizer = Diarizer(hf_token=settings.get("huggingface_token"))
-                logger.info("Diarizer enabled")
-            except Exception as e:
-                logger.warning("Diarizer not available: %s", e)
+        self._diarizer_failed = False
 
         # Set up menu
         self.menu = [
@@ -99,14 +111,91 @@ class OpenMeetApp(rumps.App):
             rumps.MenuItem("Quit OpenMeet", callback=self.quit_app)
         ]
 
+        # Cache MenuItem references - each self.menu[...] lookup is a dict
+        # access plus an ObjC bridge trip
+        self._mi_start = self.menu["Start Recording"]
+        self._mi_stop = self.menu["Stop Recording"]
+        self._mi_show = self.menu["Show Transcript"]
+
         # Initial state - disable until recording
-        self.menu["Stop Recording"].set_callback(None)
-        self.menu["Show Transcript"].set_callback(None)
+        self._mi_stop.set_callback(None)
+        self._mi_show.set_callback(None)
 
         self.title = ""
 
+        # Pre-load models in the background so the first recording
+        # click doesn't stall on imports
+        threading.Thread(target=self._warm_models, daemon=True).start()
+
         logger.info("OpenMeet initialized!")
 
+    def _warm_models(self):
+        """Pre-import and instantiate heavy components after the menu is up."""
+        try:
+            self._get_transcriber()
+            self._get_summarizer()
+            logger.info("Model warm-up complete")
+        except Exception as e:
+            logger.warning("Model warm-up failed (will retry on first use): %s", e)
+
+    def _get_transcriber(self):
+        """Lazy-load the Transcriber on first use."""
+        with self._model_load_lock:
+            if self.transcriber is None:
+                from transcriber import Transcriber
+                self.transcriber = Transcriber()
+            return self.transcriber
+
+    def _get_summarizer(self):
+        """Lazy-load the Summarizer on first use. Returns None if unavailable."""
+        with self._model_load_lock:
+            if self.summarizer is None and not self._summarizer_failed:
+                try:
+                    from summarizer import Summarizer
+                    self.summarizer = Summarizer()
+                except RuntimeError:
+                    logger.warning("Summarizer not available (model not found)")
+                    self._summarizer_failed = True
+            return self.summarizer
+
+    def _get_diarizer(self):
+        """Lazy-load the Diarizer on first use (only if enabled in settings)."""
+        if not settings.get("diarization_enabled"):
+            return None
+        with self._model_load_lock:
+            if self.diarizer is None and not self._diarizer_failed:
+                try:
+                    from diarizer import Diarizer
+                    self.diarizer = Diarizer(hf_token=settings.get("huggingface_token"))
+                    logger.info("Diarizer enabled")
+                except Exception as e:
+                    logger.warning("Diarizer not available: %s", e)
+                    self._diarizer_failed = True
+            return self.diarizer
+
+    def _set_recording_ui(self, recording):
+        """Flip icon/menu state for a recording transition; posts one notification."""
+        self.title = ""
+        if recording:
+            self.icon = ICON_RECORDING
+            self._mi_start.set_callback(None)
+            self._mi_stop.set_callback(self.stop_recording)
+            self._mi_show.set_callback(self.show_transcript)
+            rumps.notification(
+                title="OpenMeet",
+                subtitle="Recording Started",
+                message="Meeting audio is being captured and transcribed"
+            )
+        else:
+            self.icon = ICON_PROCESSING
+            self._mi_start.set_callback(self.start_recording)
+            self._mi_stop.set_callback(None)
+            rumps.notification(
+                title="OpenMeet",
+                subtitle="Recording Stopped",
+                message="Saving audio and transcript..."
+            )
+
     @rumps.clicked("Start Recording")
     def start_recording(self, _):
         """Start recording meeting audio"""
@@ -129,24 +218,14 @@ class OpenMeetApp(rumps.App):
             return
 
         self.is_recording = True
-        self.full_transcript = []
+        with self._transcript_lock:
+            self.full_transcript.clear()
 
-        # Update UI
-        self.icon = ICON_RECORDING
-        self.title = ""
-        self.menu["Start Recording"].set_callback(None)
-        self.menu["Stop Recording"].set_callback(self.stop_recording)
-        self.menu["Show Transcript"].set_callback(self.show_transcript)
-
-        rumps.notification(
-            title="OpenMeet",
-            subtitle="Recording Started",
-            message="Meeting audio is being captured and transcribed"
-        )
+        self._set_recording_ui(True)
 
         # Start real-time transcription in background
         def transcription_worker():
-            self.transcriber.transcribe_stream(
+            self._get_transcriber().transcribe_stream(
                 self.audio_capture,
                 self._on_transcript_chunk
             )
@@ -189,17 +268,7 @@ class OpenMeetApp(rumps.App):
         else:
             chosen_format = None  # Skip summary
 
-        # Update UI
-        self.icon = ICON_PROCESSING
-        self.title = ""
-        self.menu["Start Recording"].set_callback(self.start_recording)
-        self.menu["Stop Recording"].set_callback(None)
-
-        rumps.notification(
-            title="OpenMeet",
-            subtitle="Recording Stopped",
-            message="Saving audio and transcript..."
-        )
+        self._set_recording_ui(False)
 
         def process_recording():
             logger.info("=" * 50)
@@ -208,57 +277,134 @@ class OpenMeetApp(rumps.App):
 
             wav_path = self.audio_capture.stop_recording()
 
+            # Wait for the streaming worker to flush its final batch.
+            # last_stream_seconds is counted at capture time, so right
+            # after stop the worker is usually still transcribing the
+            # last 20-40s - snapshotting now would let the skip check
+            # below drop those entries from the saved transcript.
+            worker_done = True
+            if self.transcription_thread and self.transcription_thread.is_alive():
+                logger.info("Waiting for streaming transcription to drain...")
+                self.transcription_thread.join(timeout=120)
+                worker_done = not self.transcription_thread.is_alive()
+                if not worker_done:
+                    logger.warning(
+                        "Streaming worker still busy after 120s; "
+                        "treating streamed coverage as unreliable"
+                    )
+
             if wav_path:
                 logger.info("Audio saved: %s", wav_path.name)
 
-                # Transcribe the full recording for final accuracy
-                logger.info("Generating final transcript...")
-                full_transcript_text = self.transcriber.transcribe_file(wav_path)
-
-                # Combine with real-time transcript if available
-                if self.full_transcript:
-                    combined_transcript = "\n".join(self.full_transcript)
+                with self._transcript_lock:
+                    streamed_entries = list(self.full_transcript)
+
+                # Kick off diarization in parallel - it only needs the WAV,
+                # so it can run while whisper handles the final transcript
+                diarizer = self._get_diarizer()
+                speaker_future = None
+                executor = None
+                if diarizer:
+                    logger.info("Running speaker diarization...")
+                    # Prefer the in-memory samples over re-reading the WAV
+                    session_samples = self.audio_capture.get_session_samples()
+                    source = wav_path if session_samples is None else session_samples
+                    executor = ThreadPoolExecutor(max_workers=1)
+                    speaker_future = executor.submit(diarizer.diarize, source)
+
+                transcriber = self._get_transcriber()
+                wav_duration = self._wav_duration(wav_path)
+                covered = transcriber.last_stream_seconds if worker_done else 0.0
+
+                if streamed_entries and covered >= wav_duration - CHUNK_DURATION:
+                    # Streaming already transcribed (nearly) the whole
+                    # session; a second full whisper pass would double the cost
+                    logger.info(
+                        "Streaming covered %.0fs of %.0fs; skipping final pass",
+                        covered, wav_duration
+                    )
+                elif streamed_entries:
+                    logger.info(
+                        "Transcribing uncovered tail (%.0fs of %.0fs)...",
+                        wav_duration - covered, wav_duration
+                    )
+                    tail_text = transcriber.transcribe_file_from(wav_path, covered)
+                    if tail_text:
+                        timestamp = datetime.now().strftime("%H:%M:%S")
+                        streamed_entries.append(f"[{timestamp}] {tail_text}")
                 else:
+                    # No streamed transcript at all - transcribe from scratch
+                    logger.info("Generating final transcript...")
+                    full_transcript_text = transcriber.transcribe_file(wav_path)
                     timestamp = datetime.now().strftime("%H:%M:%S")
-                    combined_transcript = f"[{timestamp}] {full_transcript_text}"
-
-                # Speaker diarization (if enabled)
-                if self.diarizer and combined_transcript:
+                    streamed_entries = [f"[{timestamp}] {full_transcript_text}"]
+
+                # Apply speaker labels once diarization finishes (if enabled).
+                # The labeled transcript only exists as one string when
+                # diarization actually produced it; otherwise entries are
+                # streamed to disk and joined lazily for the summarizer.
+                labeled_transcript = None
+                if speaker_future:
                     try:
-                        logger.info("Running speaker diarization...")
-                        combined_transcript = self.diarizer.process(
-                            wav_path, combined_transcript
-                        )
+                        speaker_segments = speaker_future.result()
+                        if streamed_entries:
+                            labeled_transcript = diarizer.label_transcript(
+                                speaker_segments, "\n".join(streamed_entries)
+                            )
                     except Exception as e:
                         logger.error("Diarization failed, using unlabeled transcript: %s", e)
+                    finally:
+                        executor.shutdown(wait=False)
 
-                # Save transcript to text file
+                # Save transcript - entry-by-entry through a large buffer
+                # rather than materializing an hours-long meeting as one string
                 txt_path = wav_path.with_suffix('.txt')
-                with open(txt_path, 'w') as f:
+                with open(txt_path, 'w', buffering=1 << 20) as f:
                     f.write("Meeting Transcript\n")
                     f.write(f"{'='*60}\n\n")
-                    f.write(combined_transcript)
-                    f.write("\n")
+                    if labeled_transcript is not None:
+                        f.write(labeled_transcript)
+                        f.write("\n")
+                    else:
+                        for entry in streamed_entries:
+                            f.write(entry)
+                            f.write("\n")
 
                 logger.info("Transcript saved: %s", txt_path.name)
 
                 # Generate AI summary
-                if chosen_format and self.summarizer and combined_transcript:
-                    logger.info("Generating %s summary...", chosen_format)
-
-                    summary = self.summarizer.generate_summary(
-                        combined_transcript,
-                        meeting_duration_minutes=None,
-                        fmt=chosen_format
+                summarizer = self._get_summarizer() if chosen_format else None
+                if chosen_format and summarizer and streamed_entries:
+                    combined_transcript = (
+                        labeled_transcript
+                        if labeled_transcript is not None
+                        else "\n".join(streamed_entries)
                     )
+                    logger.info("Generating %s summary...", chosen_format)
 
                     # Save with format indicator in filename
                     format_suffix = "" if chosen_format == "detailed" else f"_{chosen_format}"
                     summary_path = wav_path.with_name(
                         wav_path.stem + format_suffix + ".md"
                     )
+
+                    # Stream tokens straight to disk and spin the menu
+                    # title so the user sees progress during generation
+                    parts = []
                     with open(summary_path, 'w') as f:
-                        f.write(summary)
+                        for i, fragment in enumerate(summarizer.generate_summary_stream(
+                            combined_transcript,
+                            meeting_duration_minutes=None,
+                            fmt=chosen_format
+                        )):
+                            f.write(fragment)
+                            parts.append(fragment)
+                            if i % 20 == 0:
+                                f.flush()
+                                self.title = SPINNER_FRAMES[
+                                    (i // 20) % len(SPINNER_FRAMES)
+                                ]
+                    summary = "".join(parts)
 
                     logger.info("Summary saved: %s", summary_path.name)
 
@@ -292,12 +438,23 @@ class OpenMeetApp(rumps.App):
 
         threading.Thread(target=process_recording, daemon=True).start()
 
+    @staticmethod
+    def _wav_duration(wav_path):
+        """Duration of a WAV file in seconds."""
+        try:
+            with wave.open(str(wav_path), 'rb') as wf:
+                return wf.getnframes() / wf.getframerate()
+        except Exception as e:
+            logger.warning("Could not read WAV duration: %s", e)
+            return 0.0
+
     def _on_transcript_chunk(self, transcript):
         """Callback for each transcribed chunk"""
         timestamp = datetime.now().strftime("%H:%M:%S")
         entry = f"[{timestamp}] {transcript}"
 
-        self.full_transcript.append(entry)
+        with self._transcript_lock:
+            self.full_transcript.append(entry)
 
         logger.info("=" * 60)
         logger.info("TRANSCRIPT: %s", entry)
@@ -306,20 +463,28 @@ class OpenMeetApp(rumps.App):
     @rumps.clicked("Open Latest Summary")
     def open_latest_summary(self, _):
         """Open the most recent summary"""
-        from utils.config import TRANSCRIPTS_DIR
-        import subprocess
-
-        summaries = list(TRANSCRIPTS_DIR.glob("meeting_*.md"))
-
-        if not summaries:
+        # Single scandir pass with one cached stat per entry - glob +
+        # Path.stat would hit the filesystem twice per summary
+        latest = None
+        latest_mtime = -1.0
+        with os.scandir(TRANSCRIPTS_DIR) as it:
+            for entry in it:
+                if (entry.name.startswith("meeting_")
+                        and entry.name.endswith(".md")
+                        and entry.is_file(follow_symlinks=False)):
+                    mtime = entry.stat(follow_symlinks=False).st_mtime
+                    if mtime > latest_mtime:
+                        latest_mtime = mtime
+                        latest = entry.path
+
+        if latest is None:
             rumps.alert(
                 title="No Summaries",
                 message="No meeting summaries found yet.\n\nRecord a meeting to generate a summary!"
             )
             return
 
-        latest = max(summaries, key=lambda p: p.stat().st_mtime)
-        subprocess.run(["open", "-t", str(latest)])
+        _spawn_open(latest, text_editor=True)
 
     @rumps.clicked("Show Transcript")
     def show_transcript(self, _):
@@ -331,10 +496,23 @@ class OpenMeetApp(rumps.App):
             )
             return
 
-        transcript_text = "\n\n".join(self.full_transcript)
-
-        if len(transcript_text) > 500:
-            transcript_text = transcript_text[-500:] + "\n\n(showing last 500 characters)"
+        # Walk the transcript backwards until the preview budget is spent -
+        # O(tail) regardless of how long the meeting has been running
+        budget = TRANSCRIPT_PREVIEW_CHARS
+        parts = []
+        with self._transcript_lock:
+            for entry in reversed(self.full_transcript):
+                parts.append(entry)
+                budget -= len(entry) + 2
+                if budget <= 0:
+                    break
+
+        transcript_text = "\n\n".join(reversed(parts))
+
+        if budget <= 0:
+            transcript_text += (
+                f"\n\n(showing last ~{TRANSCRIPT_PREVIEW_CHARS} characters)"
+            )
 
         rumps.alert(
             title="Current Transcript",
@@ -344,89 +522,104 @@ class OpenMeetApp(rumps.App):
     @rumps.clicked("View Past Meetings")
     def view_past_meetings(self, _):
         """Open folder with past transcripts"""
-        from utils.config import TRANSCRIPTS_DIR
-        import subprocess
-
         TRANSCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
-        subprocess.run(["open", str(TRANSCRIPTS_DIR)])
+        _spawn_open(TRANSCRIPTS_DIR)
+
+    # Dialog field -> (settings key, allowed values or None for free-form)
+    SETTING_FIELDS = {
+        "model": ("whisper_model", ("tiny", "base", "small", "medium")),
+        "language": ("language", None),
+        "format": ("summary_format", ("detailed", "bullets", "executive", "email")),
+        "diarization": ("diarization_enabled", ("on", "off")),
+    }
 
     @rumps.clicked("Settings")
     def open_settings(self, _):
-        """Open settings dialogs"""
+        """Open the preferences dialog - all settings in one window"""
         current = settings.all()
 
+        default_text = (
+            f"model={current['whisper_model']};"
+            f"language={current['language']};"
+            f"format={current['summary_format']};"
+            f"diarization={'on' if current['diarization_enabled'] else 'off'}"
+        )
+
         window = rumps.Window(
             title="OpenMeet Settings",
             message=(
-                f"Current Settings:\n\n"
-                f"  Whisper Model: {current['whisper_model']}\n"
-                f"  Language: {current['language']}\n"
-                f"  Summary Format: {current['summary_format']}\n"
-                f"  Diarization: {'On' if current['diarization_enabled'] else 'Off'}\n"
-                f"\nEnter setting to change:\n"
-                f"  model / language / format / diarization"
+                "Edit values below (key=value pairs separated by ';'):\n\n"
+                "  model: tiny / base / small / medium\n"
+                "  language: en / fr / es / de / ja / zh / etc.\n"
+                "  format: detailed / bullets / executive / email\n"
+                "  diarization: on / off"
             ),
-            default_text="",
-            ok="Next",
-            cancel="Close"
+            default_text=default_text,
+            ok="Save",
+            cancel="Cancel"
         )
         window.icon = ICON_DEFAULT
         response = window.run()
 
         if response.clicked:
-            self._handle_setting_change(response.text.strip().lower())
-
-    def _handle_setting_change(self, setting_name):
-        """Handle individual setting change via dialog"""
-        if setting_name == "model":
-            window = rumps.Window(
-                title="Whisper Model",
-                message="Choose model size:\n  tiny / base / small / medium",
-                default_text=settings.get("whisper_model")
-            )
-            window.icon = ICON_DEFAULT
-            resp = window.run()
-            if resp.clicked and resp.text.strip() in ("tiny", "base", "small", "medium"):
-                settings.set("whisper_model", resp.text.strip())
-                settings.save()
-                rumps.alert("Settings", f"Whisper model set to: {resp.text.strip()}\n\nRestart app to apply.")
-
-        elif setting_name == "language":
-            window = rumps.Window(
-                title="Language",
-                message="Enter language code:\n  en / fr / es / de / ja / zh / etc.",
-                default_text=settings.get("language")
+            self._apply_settings_text(response.text)
+
+    def _apply_settings_text(self, text):
+        """Parse the 'key=value;...' dialog string and persist changes once"""
+        try:
+            pairs = dict(
+                kv.split("=", 1) for kv in text.split(";") if kv.strip()
             )
-            window.icon = ICON_DEFAULT
-            resp = window.run()
-            if resp.clicked and resp.text.strip():
-                settings.set("language", resp.text.strip())
-                settings.save()
-                rumps.alert("Settings", f"Language set to: {resp.text.strip()}")
-
-        elif setting_name == "format":
-            window = rumps.Window(
-                title="Summary Format",
-                message="Choose format:\n  detailed / bullets / executive / email",
-                default_text=settings.get("summary_format")
+        except ValueError:
+            rumps.alert(
+                "Settings",
+                "Could not parse settings.\n\nExpected key=value pairs separated by ';'"
             )
-            window.icon = ICON_DEFAULT
-            resp = window.run()
-            if resp.clicked and resp.text.strip() in ("detailed", "bullets", "executive", "email"):
-                settings.set("summary_format", resp.text.strip())
-                settings.save()
-                rumps.alert("Settings", f"Summary format set to: {resp.text.strip()}")
-
-        elif setting_name == "diarization":
-            current = settings.get("diarization_enabled")
-            new_val = not current
-            settings.set("diarization_enabled", new_val)
+            return
+
+        changed = []
+        invalid = []
+
+        for key, raw_value in pairs.items():
+            key = key.strip().lower()
+            value = raw_value.strip()
+
+            field = self.SETTING_FIELDS.get(key)
+            if field is None:
+                invalid.append(key)
+                continue
+
+            setting_key, allowed = field
+            if allowed:
+                # Enum-constrained fields are matched and stored in
+                # lowercase - "Base" must persist as "base", or the
+                # derived ggml-Base.bin path breaks the next launch
+                value = value.lower()
+                if value not in allowed:
+                    invalid.append(f"{key}={raw_value.strip()}")
+                    continue
+            if not value:
+                invalid.append(key)
+                continue
+
+            if setting_key == "diarization_enabled":
+                value = value.lower() == "on"
+
+            if value != settings.get(setting_key):
+                settings.set(setting_key, value)
+                changed.append(key)
+
+        if changed:
             settings.save()
-            state = "enabled" if new_val else "disabled"
-            rumps.alert("Settings", f"Speaker diarization {state}.\n\nRestart app to apply.")
 
-        else:
-            rumps.alert("Settings", f"Unknown setting: '{setting_name}'\n\nTry: model / language / format / diarization")
+        if invalid:
+            rumps.alert("Settings", f"Ignored invalid entries: {', '.join(invalid)}")
+        if changed:
+            rumps.alert(
+                "Settings",
+                f"Updated: {', '.join(changed)}\n\n"
+                "Restart app to apply model/diarization changes."
+            )
 
     @rumps.clicked("About")
     def show_about(self, _):
@@ -4,10 +4,9 @@ Audio capture from system audio or microphone
 import pyaudio
 import wave
 import numpy as np
+from collections import deque
 from pathlib import Path
-from datetime import datetime
 import threading
-import queue
 import time
 import logging
 
@@ -23,6 +22,14 @@ logger = logging.getLogger(__name__)
 MAX_RECONNECT_ATTEMPTS = 3
 RECONNECT_DELAY_SECONDS = 1.0
 
+# Bytes per sample for paInt16 capture - fixed, so no per-session
+# get_sample_size round-trip through PortAudio
+_SAMPLE_WIDTH = 2
+
+# Capacity of the live-transcription ring buffer. The transcriber drains
+# every ~10s, so 30s of slack tolerates a slow whisper pass without drops.
+RING_SECONDS = 30
+
 
 class AudioCapture:
     """Captures audio and saves to WAV files"""
@@ -31,9 +38,25 @@ class AudioCapture:
         self.audio = pyaudio.PyAudio()
         self.stream = None
         self.is_recording = False
-        self.frames = []
         self.current_session_id = None
-        self.audio_queue = queue.Queue()
+        # Incoming buffers are handed from the callback to a dedicated
+        # writer thread that streams them into the open WAV file, so
+        # memory stays bounded regardless of meeting length
+        self._write_queue = deque()
+        self._writer_thread = None
+        self._writer_stop = threading.Event()
+        self._wf = None
+        self._wav_path = None
+        # Preallocated SPSC ring buffer for the live-transcription feed.
+        # The callback copies samples in and bumps _write_count; the
+        # consumer copies out and bumps _read_count. Counters are plain
+        # ints (atomic under the GIL), so neither side ever takes a lock.
+        self._ring = np.empty(SAMPLE_RATE * RING_SECONDS * CHANNELS, dtype=np.int16)
+        self._write_count = 0
+        self._read_count = 0
+        # Reusable output buffer for get_audio_chunk - sized to the ring,
+        # so draining never allocates
+        self._chunk_buf = np.empty(self._ring.size, dtype=np.int16)
         self._device_index = None
 
         logger.info("AudioCapture initialized")
@@ -77,7 +100,7 @@ class AudioCapture:
             return False
 
         try:
-            self.current_session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.current_session_id = time.strftime("%Y%m%d_%H%M%S")
 
             device_index = self.find_input_device()
             if device_index is None:
@@ -87,6 +110,18 @@ class AudioCapture:
             self._device_index = device_index
             logger.info("Starting recording session: %s", self.current_session_id)
 
+            # Open the output WAV up front; the writer thread streams
+            # frames into it for the whole session and close() patches
+            # the RIFF chunk sizes at stop
+            self._wav_path = TRANSCRIPTS_DIR / f"meeting_{self.current_session_id}.wav"
+            self._wf = wave.open(str(self._wav_path), 'wb')
+            self._wf.setparams(
+                (CHANNELS, _SAMPLE_WIDTH, SAMPLE_RATE, 0, 'NONE', 'not compressed')
+            )
+
+            # PyAudio doesn't expose paClipOff/paDitherOff; the fixed
+            # power-of-two frames_per_buffer at least keeps PortAudio's
+            # host buffers a stable size across callbacks
             self.stream = self.audio.open(
                 format=pyaudio.paInt16,
                 channels=CHANNELS,
@@ -98,7 +133,15 @@ class AudioCapture:
             )
 
             self.is_recording = True
-            self.frames = []
+            self._write_queue.clear()
+            self._write_count = 0
+            self._read_count = 0
+
+            self._writer_stop.clear()
+            self._writer_thread = threading.Thread(
+                target=self._writer_loop, daemon=True
+            )
+            self._writer_thread.start()
 
             self.stream.start_stream()
 
@@ -108,13 +151,25 @@ class AudioCapture:
         except Exception as e:
             logger.error("Failed to start recording: %s", e)
             logger.info("Tip: Check System Preferences > Security & Privacy > Microphone")
+            if self._wf:
+                self._wf.close()
+                self._wf = None
             return False
 
     def _audio_callback(self, in_data, frame_count, time_info, status):
         """Callback for audio stream (called by PyAudio)"""
         if self.is_recording:
-            self.frames.append(in_data)
-            self.audio_queue.put(in_data)
+            self._write_queue.append(in_data)
+
+            samples = np.frombuffer(in_data, dtype=np.int16)
+            n = samples.size
+            size = self._ring.size
+            w = self._write_count % size
+            first = min(n, size - w)
+            self._ring[w:w + first] = samples[:first]
+            if first < n:
+                self._ring[:n - first] = samples[first:]
+            self._write_count += n
 
         return (in_data, pyaudio.paContinue)
 
@@ -155,8 +210,36 @@ class AudioCapture:
         logger.error("All reconnection attempts failed")
         return False
 
+    def _writer_loop(self):
+        """Drain queued buffers into the open WAV file (writer thread)."""
+        while True:
+            try:
+                chunk = self._write_queue.popleft()
+            except IndexError:
+                if self._writer_stop.is_set():
+                    return
+                time.sleep(0.05)
+                continue
+            # Gather whatever else is already queued so the backlog goes
+            # down in one write instead of one call per callback buffer
+            pending = [chunk]
+            while True:
+                try:
+                    pending.append(self._write_queue.popleft())
+                except IndexError:
+                    break
+            try:
+                # writeframesraw skips the per-call RIFF header patch;
+                # close() fixes up the chunk sizes exactly once
+                self._wf.writeframesraw(
+                    pending[0] if len(pending) == 1 else b"".join(pending)
+                )
+            except Exception as e:
+                logger.error("WAV write failed: %s", e)
+                return
+
     def stop_recording(self):
-        """Stop capturing audio and save to file"""
+        """Stop capturing audio and finalize the WAV file"""
         if not self.is_recording:
             logger.warning("Not recording!")
             return None
@@ -169,8 +252,16 @@ class AudioCapture:
                 self.stream.stop_stream()
                 self.stream.close()
 
-            wav_path = self._save_audio()
+            # Let the writer flush whatever the callback enqueued, then
+            # close() to patch the RIFF chunk sizes
+            self._writer_stop.set()
+            if self._writer_thread:
+                self._writer_thread.join()
+                self._writer_thread = None
+            self._wf.close()
+            self._wf = None
 
+            wav_path = self._wav_path
             logger.info("Recording saved: %s", wav_path.name)
             logger.info("File size: %.1f KB", wav_path.stat().st_size / 1024)
 
@@ -180,46 +271,75 @@ class AudioCapture:
             logger.error("Failed to stop recording: %s", e)
             return None
 
-    def _save_audio(self):
-        """Save recorded audio to WAV file"""
-        filename = f"meeting_{self.current_session_id}.wav"
-        wav_path = TRANSCRIPTS_DIR / filename
-
-        with wave.open(str(wav_path), 'wb') as wf:
-            wf.setnchannels(CHANNELS)
-            wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))
-            wf.setframerate(SAMPLE_RATE)
-            wf.writeframes(b''.join(self.frames))
-
-        return wav_path
+    def get_session_samples(self):
+        """
+        All samples from the last finished session as a numpy int16 array,
+        or None if nothing was captured. Audio is streamed to disk during
+        recording, so this reads the (still page-cached) WAV back - the
+        diarizer then skips its own decode pass.
+        """
+        if self._wav_path is None or not self._wav_path.exists():
+            return None
+        try:
+            with wave.open(str(self._wav_path), 'rb') as wf:
+                data = wf.readframes(wf.getnframes())
+        except Exception as e:
+            logger.warning("Could not read back session audio: %s", e)
+            return None
+        if not data:
+            return None
+        return np.frombuffer(data, dtype=np.int16)
 
     def get_audio_chunk(self, duration_seconds=5):
         """
         Get accumulated audio chunk for transcription.
-        Returns numpy array of audio data.
+
+        Returns a numpy int16 view into a reused buffer; the data is only
+        valid until the next call (the transcriber serializes it to a temp
+        WAV immediately).
         """
-        chunks_needed = int(SAMPLE_RATE * duration_seconds / CHUNK_SIZE)
-        audio_data = []
-        start_time = time.time()
+        need = int(SAMPLE_RATE * duration_seconds) * CHANNELS
+        deadline = time.time() + duration_seconds * 2
 
-        while len(audio_data) < chunks_needed:
-            if time.time() - start_time > duration_seconds * 2:
+        while self._write_count - self._read_count < need:
+            if time.time() > deadline or not self.is_recording:
                 break
-            try:
-                chunk = self.audio_queue.get(timeout=0.5)
-                audio_data.append(np.frombuffer(chunk, dtype=np.int16))
-            except queue.Empty:
-                if not self.is_recording:
-                    break
+            time.sleep(0.05)
+
+        return self._drain_ring()
+
+    def _drain_ring(self):
+        """Copy all available samples out of the ring buffer."""
+        size = self._ring.size
+        if self._write_count - self._read_count > size:
+            # Producer lapped us - skip ahead to the oldest intact sample
+            logger.warning("Ring buffer overrun; dropping oldest audio")
+            self._read_count = self._write_count - size
+
+        count = self._write_count - self._read_count
+        if count == 0:
+            return None
 
-        if audio_data:
-            return np.concatenate(audio_data)
-        return None
+        out = self._chunk_buf[:count]
+        r = self._read_count % size
+        first = min(count, size - r)
+        out[:first] = self._ring[r:r + first]
+        if first < count:
+            out[first:] = self._ring[:count - first]
+        self._read_count += count
+        return out
 
     def cleanup(self):
         """Clean up audio resources"""
         if self.stream:
             self.stream.close()
+        self._writer_stop.set()
+        if self._writer_thread:
+            self._writer_thread.join()
+            self._writer_thread = None
+        if self._wf:
+            self._wf.close()
+            self._wf = None
         self.audio.terminate()
         logger.info("AudioCapture cleaned up")
 
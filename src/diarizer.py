@@ -3,11 +3,125 @@ Speaker diarization using pyannote.audio
 Identifies who spoke when, aligned with whisper transcription timestamps.
 """
 import re
+import sys
+import hashlib
 import logging
 from pathlib import Path
 
+import numpy as np
+
+from utils.config import SAMPLE_RATE
+
 logger = logging.getLogger(__name__)
 
+_PIPELINE_MODEL = "pyannote/speaker-diarization-3.1"
+
+# Loaded pipelines, keyed by (model, token digest) so every Diarizer
+# instance in the process shares one copy of the model weights
+_pipeline_cache = {}
+
+# One combined pattern for both timestamp formats, compiled once at import.
+# Groups 1-8 + 9 are the whisper-cpp format, groups 10-12 + 13 the app
+# runtime format.
+_TIMESTAMP_RE = re.compile(
+    r'^[ \t]*(?:'
+    r'\[(\d{2}):(\d{2}):(\d{2})\.(\d{3})\s*-->\s*'
+    r'(\d{2}):(\d{2}):(\d{2})\.(\d{3})\]\s*(.*)'
+    r'|'
+    r'\[(\d{2}):(\d{2}):(\d{2})\]\s*(.*)'
+    r')$',
+    re.MULTILINE
+)
+
+# Assumed duration of an entry in the runtime format (one streaming chunk)
+_RUNTIME_SEGMENT_SECONDS = 10.0
+
+# Canonical speaker labels, interned once; meetings with more than 32
+# speakers fall back to generating names on the fly
+_LABELS = tuple(sys.intern(f"Speaker {i + 1}") for i in range(32))
+
+
+class SpeakerTurns:
+    """
+    Speaker segments in structure-of-arrays form: parallel start/end
+    float64 arrays plus int32 indices into a label table. Keeps the
+    alignment math on contiguous arrays instead of unpacking a tuple
+    per segment.
+    """
+
+    __slots__ = ("start", "end", "label_idx", "labels")
+
+    def __init__(self, start, end, label_idx, labels):
+        self.start = start
+        self.end = end
+        self.label_idx = label_idx
+        self.labels = labels
+
+    def __len__(self):
+        return self.start.size
+
+    @classmethod
+    def from_tuples(cls, segments):
+        """Build from a list of (start, end, label) tuples."""
+        label_map = {}
+        label_idx = []
+        for _, _, label in segments:
+            label_idx.append(label_map.setdefault(label, len(label_map)))
+        return cls(
+            np.asarray([s[0] for s in segments], dtype=np.float64),
+            np.asarray([s[1] for s in segments], dtype=np.float64),
+            np.asarray(label_idx, dtype=np.int32),
+            list(label_map),
+        )
+
+
+class SpeakerIndex:
+    """
+    Sorted interval index over speaker turns for repeated overlap
+    queries. Built once per diarization result; each query binary-
+    searches the start array and computes overlaps only for the narrow
+    candidate slice, so streaming callers labelling transcript segments
+    as they arrive pay O(log N + k) per segment instead of O(N), and
+    batch alignment avoids materializing the full N x M overlap matrix.
+    """
+
+    __slots__ = ("_starts", "_ends", "_label_idx", "_labels", "_max_end")
+
+    def __init__(self, turns):
+        if not isinstance(turns, SpeakerTurns):
+            turns = SpeakerTurns.from_tuples(turns)
+        order = np.argsort(turns.start, kind="stable")
+        self._starts = turns.start[order]
+        self._ends = turns.end[order]
+        self._label_idx = turns.label_idx[order]
+        self._labels = turns.labels
+        # Running maximum of ends: turns before the first index whose
+        # running max exceeds a query start cannot overlap the query
+        self._max_end = np.maximum.accumulate(self._ends)
+
+    def __len__(self):
+        return self._starts.size
+
+    def align_one(self, start, end):
+        """
+        Label of the speaker turn with maximum overlap against
+        [start, end], or None when nothing overlaps.
+        """
+        hi = int(np.searchsorted(self._starts, end, side="left"))
+        if hi == 0:
+            return None
+        lo = int(np.searchsorted(self._max_end[:hi], start, side="right"))
+        if lo >= hi:
+            return None
+        overlap = (
+            np.minimum(self._ends[lo:hi], end)
+            - np.maximum(self._starts[lo:hi], start)
+        )
+        best = int(overlap.argmax())
+        if overlap[best] <= 0.0:
+            return None
+        return self._labels[self._label_idx[lo + best]]
+
 
 class Diarizer:
     """
@@ -30,20 +144,47 @@ class Diarizer:
         self.hf_token = hf_token
         self.pipeline = None
         self._initialized = False
+        # Incremental-parse state: segments parsed so far and how far
+        # into the transcript text they cover
+        self._parse_offset = 0
+        self._parsed_segments = []
 
     def _ensure_pipeline(self):
-        """Lazy-load the pyannote pipeline."""
+        """Lazy-load the pyannote pipeline (shared per-process)."""
         if self._initialized:
             return
 
+        # Hash rather than store the token in the cache key
+        token_digest = hashlib.blake2b(
+            (self.hf_token or "").encode(), digest_size=8
+        ).hexdigest()
+        cache_key = (_PIPELINE_MODEL, token_digest)
+
+        cached = _pipeline_cache.get(cache_key)
+        if cached is not None:
+            self.pipeline = cached
+            self._initialized = True
+            return
+
         try:
             from pyannote.audio import Pipeline
 
             logger.info("Loading pyannote speaker diarization pipeline...")
-            self.pipeline = Pipeline.from_pretrained(
-                "pyannote/speaker-diarization-3.1",
+            pipeline = Pipeline.from_pretrained(
+                _PIPELINE_MODEL,
                 use_auth_token=self.hf_token
             )
+
+            # Run on GPU when one is available
+            try:
+                import torch
+                if torch.cuda.is_available():
+                    pipeline.to(torch.device("cuda"))
+            except Exception as e:
+                logger.debug("GPU placement skipped: %s", e)
+
+            _pipeline_cache[cache_key] = pipeline
+            self.pipeline = pipeline
             self._initialized = True
             logger.info("Pyannote pipeline loaded successfully")
 
@@ -57,40 +198,63 @@ class Diarizer:
             logger.error("Failed to load pyannote pipeline: %s", e)
             raise
 
-    def diarize(self, wav_path):
+    def diarize(self, source):
         """
-        Run speaker diarization on a WAV file.
+        Run speaker diarization on recorded audio.
 
         Args:
-            wav_path: Path to the WAV audio file
+            source: Path to a WAV file, or a numpy int16 array of samples
+                already in memory. Passing the in-memory samples skips a
+                full file read + decode inside pyannote.
 
         Returns:
-            List of (start_seconds, end_seconds, speaker_label) tuples
+            SpeakerTurns with labels normalized to "Speaker 1", "Speaker 2", ...
         """
         self._ensure_pipeline()
 
-        logger.info("Running diarization on %s...", wav_path.name)
-        diarization = self.pipeline(str(wav_path))
-
-        segments = []
-        for turn, _, speaker in diarization.itertracks(yield_label=True):
-            segments.append((turn.start, turn.end, speaker))
-
-        # Normalize speaker labels to "Speaker 1", "Speaker 2", etc.
+        if isinstance(source, np.ndarray):
+            import torch
+            logger.info("Running diarization on in-memory audio...")
+            # Single fused cast+scale pass instead of astype then divide
+            # (which would materialize two meeting-length arrays)
+            waveform = torch.from_numpy(
+                np.multiply(source, np.float32(1.0 / 32768.0), dtype=np.float32)
+            ).unsqueeze(0)
+            diarization = self.pipeline(
+                {"waveform": waveform, "sample_rate": SAMPLE_RATE}
+            )
+        else:
+            logger.info("Running diarization on %s...", source.name)
+            diarization = self.pipeline(str(source))
+
+        # Collect straight into structure-of-arrays form; label indices
+        # are assigned in first-seen order, which gives the normalized
+        # "Speaker 1", "Speaker 2", ... naming directly
+        starts, ends, label_idx = [], [], []
         speaker_map = {}
-        counter = 1
-        normalized = []
-        for start, end, speaker in segments:
-            if speaker not in speaker_map:
-                speaker_map[speaker] = f"Speaker {counter}"
-                counter += 1
-            normalized.append((start, end, speaker_map[speaker]))
+        for turn, _, speaker in diarization.itertracks(yield_label=True):
+            starts.append(turn.start)
+            ends.append(turn.end)
+            label_idx.append(speaker_map.setdefault(speaker, len(speaker_map)))
+
+        n_speakers = len(speaker_map)
+        if n_speakers <= len(_LABELS):
+            labels = list(_LABELS[:n_speakers])
+        else:
+            labels = [f"Speaker {i + 1}" for i in range(n_speakers)]
+
+        turns = SpeakerTurns(
+            np.asarray(starts, dtype=np.float64),
+            np.asarray(ends, dtype=np.float64),
+            np.asarray(label_idx, dtype=np.int32),
+            labels,
+        )
 
         logger.info(
             "Diarization complete: %d segments, %d speakers",
-            len(normalized), len(speaker_map)
+            len(turns), len(turns.labels)
         )
-        return normalized
+        return turns
 
     @staticmethod
     def parse_whisper_timestamps(raw_transcript):
@@ -104,44 +268,68 @@ class Diarizer:
         Returns:
             List of (start_sec, end_sec, text) tuples
         """
-        segments = []
-
-        # whisper-cpp format
-        whisper_pattern = re.compile(
-            r'\[(\d{2}):(\d{2}):(\d{2})\.(\d{3})\s*-->\s*'
-            r'(\d{2}):(\d{2}):(\d{2})\.(\d{3})\]\s*(.*)'
-        )
-
-        # app runtime format
-        runtime_pattern = re.compile(
-            r'\[(\d{2}):(\d{2}):(\d{2})\]\s*(.*)'
-        )
-
-        for line in raw_transcript.strip().split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-
-            m = whisper_pattern.match(line)
-            if m:
-                start = (int(m.group(1)) * 3600 + int(m.group(2)) * 60
-                         + int(m.group(3)) + int(m.group(4)) / 1000)
-                end = (int(m.group(5)) * 3600 + int(m.group(6)) * 60
-                       + int(m.group(7)) + int(m.group(8)) / 1000)
+        # Single scan over the whole transcript; the digit fields are kept
+        # as strings and converted in bulk by numpy instead of eight int()
+        # calls per line
+        w_fields, w_texts, w_pos = [], [], []
+        r_fields, r_texts, r_pos = [], [], []
+
+        for m in _TIMESTAMP_RE.finditer(raw_transcript):
+            if m.group(9) is not None:
                 text = m.group(9).strip()
                 if text:
-                    segments.append((start, end, text))
-                continue
-
-            m = runtime_pattern.match(line)
-            if m:
-                start = (int(m.group(1)) * 3600 + int(m.group(2)) * 60
-                         + int(m.group(3)))
-                text = m.group(4).strip()
+                    w_fields.append(m.group(1, 2, 3, 4, 5, 6, 7, 8))
+                    w_texts.append(text)
+                    w_pos.append(m.start())
+            else:
+                text = m.group(13).strip()
                 if text:
-                    segments.append((start, start + 10.0, text))
+                    r_fields.append(m.group(10, 11, 12))
+                    r_texts.append(text)
+                    r_pos.append(m.start())
+
+        tagged = []
+
+        if w_fields:
+            g = np.array(w_fields, dtype=np.float64)
+            starts = g[:, 0] * 3600 + g[:, 1] * 60 + g[:, 2] + g[:, 3] / 1000
+            ends = g[:, 4] * 3600 + g[:, 5] * 60 + g[:, 6] + g[:, 7] / 1000
+            tagged.extend(zip(w_pos, starts.tolist(), ends.tolist(), w_texts))
+
+        if r_fields:
+            g = np.array(r_fields, dtype=np.float64)
+            starts = g[:, 0] * 3600 + g[:, 1] * 60 + g[:, 2]
+            ends = starts + _RUNTIME_SEGMENT_SECONDS
+            tagged.extend(zip(r_pos, starts.tolist(), ends.tolist(), r_texts))
+
+        # Restore original line order across the two formats
+        tagged.sort()
+        return [(start, end, text) for _, start, end, text in tagged]
+
+    def parse_whisper_timestamps_incremental(self, raw_transcript):
+        """
+        Incremental variant of parse_whisper_timestamps for transcripts
+        that only ever grow (the streaming loop appends entries). Each
+        call scans just the text added since the previous call, so
+        repeated parsing of an N-line meeting stays O(N) overall.
+
+        Returns:
+            The accumulated list of (start_sec, end_sec, text) tuples.
+        """
+        if len(raw_transcript) < self._parse_offset:
+            # Transcript was replaced rather than extended; start over
+            self._parse_offset = 0
+            self._parsed_segments = []
+
+        # Only consume complete lines - a partially written last line is
+        # left for the next call
+        end = raw_transcript.rfind('\n') + 1
+        if end > self._parse_offset:
+            new_text = raw_transcript[self._parse_offset:end]
+            self._parsed_segments.extend(self.parse_whisper_timestamps(new_text))
+            self._parse_offset = end
 
-        return segments
+        return self._parsed_segments
 
     @staticmethod
     def align_speakers_with_transcript(speaker_segments, transcript_segments):
@@ -150,28 +338,24 @@ class Diarizer:
         using maximum temporal overlap.
 
         Args:
-            speaker_segments: List of (start, end, speaker_label)
+            speaker_segments: SpeakerTurns, or a list of
+                (start, end, speaker_label) tuples
             transcript_segments: List of (start, end, text)
 
         Returns:
             List of (speaker_label, text) tuples
         """
-        labeled = []
-
-        for t_start, t_end, text in transcript_segments:
-            best_speaker = "Unknown"
-            best_overlap = 0.0
-
-            for s_start, s_end, speaker in speaker_segments:
-                overlap_start = max(t_start, s_start)
-                overlap_end = min(t_end, s_end)
-                overlap = max(0.0, overlap_end - overlap_start)
+        if not transcript_segments:
+            return []
 
-                if overlap > best_overlap:
-                    best_overlap = overlap
-                    best_speaker = speaker
+        index = SpeakerIndex(speaker_segments)
+        if len(index) == 0:
+            return [("Unknown", text) for _, _, text in transcript_segments]
 
-            labeled.append((best_speaker, text))
+        labeled = []
+        for t_start, t_end, text in transcript_segments:
+            label = index.align_one(t_start, t_end)
+            labeled.append((label if label is not None else "Unknown", text))
 
         return labeled
 
@@ -187,14 +371,31 @@ class Diarizer:
             Speaker-labeled transcript as formatted string
         """
         speaker_segments = self.diarize(wav_path)
+        return self.label_transcript(speaker_segments, raw_transcript)
+
+    @classmethod
+    def label_transcript(cls, speaker_segments, raw_transcript):
+        """
+        Align pre-computed speaker segments with a transcript and format.
+
+        Split out from process() so callers can run diarize() concurrently
+        with transcription and apply the labels afterwards.
+
+        Args:
+            speaker_segments: SpeakerTurns from diarize() (tuple lists
+                also accepted)
+            raw_transcript: Raw transcript text (with timestamps)
 
-        transcript_segments = self.parse_whisper_timestamps(raw_transcript)
+        Returns:
+            Speaker-labeled transcript as formatted string
+        """
+        transcript_segments = cls.parse_whisper_timestamps(raw_transcript)
 
         if not transcript_segments:
             logger.warning("No timestamped segments found; returning unlabeled transcript")
             return raw_transcript
 
-        labeled = self.align_speakers_with_transcript(speaker_segments, transcript_segments)
+        labeled = cls.align_speakers_with_transcript(speaker_segments, transcript_segments)
 
         lines = []
         for speaker, text in labeled:
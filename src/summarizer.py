@@ -1,97 +1,48 @@
 """
 AI-powered meeting summarization using local LLM (llama-cpp-python)
 """
+import os
+import re
+import sys
+import time
+import hashlib
 from datetime import datetime
 import logging
 
-from utils.config import LLM_MODEL_PATH
+from utils.config import LLM_MODEL_PATH, SUMMARY_CACHE_DIR, settings
 
 logger = logging.getLogger(__name__)
 
 SUMMARY_FORMATS = ("detailed", "bullets", "executive", "email")
 
+# Formatted date shared across prompt builds; strftime goes through
+# libc and the value only changes at midnight, so refresh it at most
+# once a minute
+_DATE_CACHE = {"t": 0.0, "s": ""}
+
+
+def _today_str():
+    now = time.time()
+    if now - _DATE_CACHE["t"] > 60.0:
+        _DATE_CACHE["t"] = now
+        _DATE_CACHE["s"] = datetime.now().strftime("%B %d, %Y")
+    return _DATE_CACHE["s"]
+
+# Prompt bodies are static; build them once at import with placeholders
+# and substitute per call instead of re-assembling multi-KB f-strings.
+# Every template opens with the identical TRANSCRIPT block so llama.cpp's
+# KV cache can reuse the transcript prefill across formats - the
+# format-specific instructions only diverge after it.
+_PROMPT_DETAILED = """TRANSCRIPT:
+{transcript}
 
-class Summarizer:
-    """Generate meeting summaries using a bundled local LLM"""
-
-    def __init__(self, summary_format="detailed"):
-        self.summary_format = summary_format
-        self.model_path = LLM_MODEL_PATH
-
-        if not self.model_path.exists():
-            logger.error("LLM model not found at %s", self.model_path)
-            raise RuntimeError(f"LLM model not found: {self.model_path}")
-
-        from llama_cpp import Llama
-        logger.info("Loading LLM model: %s", self.model_path.name)
-        self.llm = Llama(
-            model_path=str(self.model_path),
-            n_ctx=2048,
-            n_threads=4,
-            verbose=False,
-        )
-        logger.info("Summarizer initialized")
-
-    def generate_summary(self, transcript, meeting_duration_minutes=None, fmt=None):
-        """
-        Generate a meeting summary from transcript.
-
-        Args:
-            transcript: Full meeting transcript text
-            meeting_duration_minutes: Optional meeting duration
-            fmt: Summary format (detailed/bullets/executive/email)
-
-        Returns:
-            Formatted summary as markdown string
-        """
-        if not transcript or len(transcript.strip()) < 10:
-            return "# Meeting Summary\n\nNo transcript available to summarize."
-
-        fmt = fmt or self.summary_format
-        prompt = self._build_summary_prompt(transcript, meeting_duration_minutes, fmt)
-
-        logger.info("Generating %s summary (%d chars)", fmt, len(transcript))
-
-        try:
-            response = self._call_llm(prompt)
-
-            if response:
-                logger.info("Summary generated successfully")
-                return response
-            else:
-                return "# Meeting Summary\n\nFailed to generate summary."
-
-        except Exception as e:
-            logger.error("Summary generation failed: %s", e)
-            return f"# Meeting Summary\n\nError: {e}"
-
-    def _build_summary_prompt(self, transcript, duration=None, fmt="detailed"):
-        """Build format-specific prompt for the LLM."""
-        builder = {
-            "detailed": self._prompt_detailed,
-            "bullets": self._prompt_bullets,
-            "executive": self._prompt_executive,
-            "email": self._prompt_email,
-        }
-
-        build_fn = builder.get(fmt, self._prompt_detailed)
-        return build_fn(transcript, duration)
-
-    def _prompt_detailed(self, transcript, duration=None):
-        """Full structured markdown format."""
-        duration_text = f"\nMeeting Duration: ~{duration} minutes" if duration else ""
-
-        return f"""You are an expert meeting assistant. Analyze this meeting transcript and provide a clear, structured summary.
-
+You are an expert meeting assistant. Analyze the meeting transcript above and provide a clear, structured summary.
 {duration_text}
 
-TRANSCRIPT:
-{transcript}
-
 Please provide a professional meeting summary with these sections:
 
 # Meeting Summary
-Date: {datetime.now().strftime("%B %d, %Y")}
+Date: {date}
 
 ## Overview
 [2-3 sentence high-level summary of what was discussed]
@@ -132,19 +83,15 @@ IMPORTANT RULES:
 
 Generate the summary now:"""
 
-    def _prompt_bullets(self, transcript, duration=None):
-        """Concise bullet points + action items."""
-        duration_text = f"\nMeeting Duration: ~{duration} minutes" if duration else ""
+_PROMPT_BULLETS = """TRANSCRIPT:
+{transcript}
 
-        return f"""You are an expert meeting assistant. Summarize this meeting as a concise bullet-point list.
+You are an expert meeting assistant. Summarize the meeting above as a concise bullet-point list.
 {duration_text}
 
-TRANSCRIPT:
-{transcript}
-
 Format your response EXACTLY like this:
 
-# Meeting Notes - {datetime.now().strftime("%B %d, %Y")}
+# Meeting Notes - {date}
 
 ## Key Points
 - [Point 1]
@@ -160,19 +107,15 @@ Format your response EXACTLY like this:
 
 RULES: Be concise. Max 10 bullet points for Key Points. Only include action items explicitly mentioned. Use markdown."""
 
-    def _prompt_executive(self, transcript, duration=None):
-        """Short 2-3 paragraph executive summary."""
-        duration_text = f"\nMeeting Duration: ~{duration} minutes" if duration else ""
+_PROMPT_EXECUTIVE = """TRANSCRIPT:
+{transcript}
 
-        return f"""You are an executive assistant. Write a brief executive summary of this meeting in 2-3 paragraphs.
+You are an executive assistant. Write a brief executive summary of the meeting above in 2-3 paragraphs.
 {duration_text}
 
-TRANSCRIPT:
-{transcript}
-
 Format:
 
-# Executive Brief - {datetime.now().strftime("%B %d, %Y")}
+# Executive Brief - {date}
 
 [2-3 paragraphs summarizing: what was discussed, what was decided, what happens next]
 
@@ -181,18 +124,14 @@ Format:
 
 RULES: Keep it under 200 words. No bullet points. Professional tone. Focus on outcomes not process."""
 
-    def _prompt_email(self, transcript, duration=None):
-        """Email-ready follow-up recap."""
-        duration_text = f" ({duration} min)" if duration else ""
-
-        return f"""You are a professional meeting coordinator. Write a follow-up email summarizing this meeting.
-
-TRANSCRIPT:
+_PROMPT_EMAIL = """TRANSCRIPT:
 {transcript}
 
+You are a professional meeting coordinator. Write a follow-up email summarizing the meeting above.
+
 Format the email EXACTLY like this:
 
-Subject: Meeting Recap - {datetime.now().strftime("%B %d, %Y")}{duration_text}
+Subject: Meeting Recap - {date}{duration_text}
 
 Hi team,
 
@@ -217,6 +156,331 @@ Best regards,
 
 RULES: Keep it professional and concise. Only include information from the transcript. Use a warm but professional tone."""
 
+# Transcripts longer than this (in model tokens) get map-reduced:
+# summarize pieces first, then summarize the summaries. n_ctx is 2048
+# and the format scaffolds run a few hundred tokens, so anything larger
+# would be silently truncated by llama.cpp
+_MAP_REDUCE_THRESHOLD = 1400
+
+# Sentence boundary used when splitting long transcripts into chunks
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Above this many characters, strip conversational filler before the
+# map-reduce/token accounting kicks in - pure string ops, no model
+_COMPRESS_THRESHOLD_CHARS = 8000
+
+# Spoken-language filler that carries no summary signal
+_FILLER_RE = re.compile(r'\b(?:um+|uh+|you know|i mean|like)\b,?\s*', re.IGNORECASE)
+
+# Leading timestamp anchor on a transcript sentence
+_ANCHOR_RE = re.compile(r'^\[\d{1,2}:\d{2}(?::\d{2})?(?:\.\d{3})?\]\s*')
+
+_PROMPT_CHUNK = """Summarize this portion of a meeting transcript in a few sentences. Keep all names, decisions, action items and dates that are mentioned. Do not invent anything.
+
+TRANSCRIPT PORTION:
+{chunk}
+
+Summary:"""
+
+_PROMPT_TEMPLATES = {
+    "detailed": _PROMPT_DETAILED,
+    "bullets": _PROMPT_BULLETS,
+    "executive": _PROMPT_EXECUTIVE,
+    "email": _PROMPT_EMAIL,
+}
+
+
+class Summarizer:
+    """Generate meeting summaries using a bundled local LLM"""
+
+    __slots__ = ("summary_format", "model_path", "llm")
+
+    def __init__(self, summary_format="detailed"):
+        self.summary_format = summary_format
+        self.model_path = LLM_MODEL_PATH
+
+        if not self.model_path.exists():
+            logger.error("LLM model not found at %s", self.model_path)
+            raise RuntimeError(f"LLM model not found: {self.model_path}")
+
+        from llama_cpp import Llama
+        logger.info("Loading LLM model: %s", self.model_path.name)
+
+        # Offload all layers to Metal on Apple Silicon - the Q4_K_M
+        # dequant+matmul is memory-bandwidth-bound and runs far faster on
+        # the GPU. metal_offload=False keeps Intel Macs on the CPU path.
+        use_metal = sys.platform == "darwin" and settings.get("metal_offload")
+
+        # Offload/batch knobs are tunable via settings for machines where
+        # the auto defaults are wrong (eGPUs, low-memory Metal parts)
+        n_gpu_layers = settings.get("llm_n_gpu_layers")
+        if n_gpu_layers is None:
+            n_gpu_layers = -1 if use_metal else 0
+
+        self.llm = Llama(
+            model_path=str(self.model_path),
+            n_ctx=2048,
+            n_threads=max(1, (os.cpu_count() or 4) // 2),
+            n_batch=settings.get("llm_n_batch") or 256,
+            n_gpu_layers=n_gpu_layers,
+            use_mmap=True,
+            use_mlock=bool(settings.get("llm_use_mlock")),
+            verbose=False,
+        )
+        # Keep prompt prefills around so the shared TRANSCRIPT prefix is
+        # computed once when several formats run on the same transcript
+        try:
+            from llama_cpp import LlamaRAMCache
+            self.llm.set_cache(LlamaRAMCache(capacity_bytes=2 << 30))
+        except Exception as e:
+            logger.debug("llama KV cache unavailable: %s", e)
+
+        logger.info("Summarizer initialized (metal_offload=%s)", bool(use_metal))
+
+    def _cache_path(self, transcript, fmt):
+        """Cache file for a (model, format, transcript) combination."""
+        key = hashlib.sha256(
+            f"{self.model_path.name}|{fmt}|{transcript}".encode()
+        ).hexdigest()
+        return SUMMARY_CACHE_DIR / f"{key}.md"
+
+    def _cache_get(self, transcript, fmt):
+        """Cached summary for this exact transcript+format, or None."""
+        try:
+            return self._cache_path(transcript, fmt).read_text()
+        except OSError:
+            return None
+
+    def _cache_put(self, transcript, fmt, summary):
+        """Store a generated summary; failures are non-fatal."""
+        try:
+            SUMMARY_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._cache_path(transcript, fmt).write_text(summary)
+        except OSError as e:
+            logger.debug("Could not cache summary: %s", e)
+
+    def _count_tokens(self, text):
+        """Token count via the model's own tokenizer, with a chars/4 fallback."""
+        try:
+            return len(self.llm.tokenize(text.encode()))
+        except Exception:
+            return len(text) // 4
+
+    def _chunk_transcript(self, transcript, max_tokens=_MAP_REDUCE_THRESHOLD):
+        """Split a transcript on sentence boundaries into token-bounded chunks."""
+        chunks = []
+        current = []
+        current_tokens = 0
+        for sentence in _SENTENCE_SPLIT_RE.split(transcript):
+            n = self._count_tokens(sentence)
+            if current and current_tokens + n > max_tokens:
+                chunks.append(" ".join(current))
+                current = []
+                current_tokens = 0
+            current.append(sentence)
+            current_tokens += n
+        if current:
+            chunks.append(" ".join(current))
+        return chunks
+
+    @staticmethod
+    def _compress_transcript(transcript):
+        """
+        Lossy text-level compression for very long transcripts. Each
+        transcript line starts at a timestamp anchor, so the first two
+        sentences of a line are kept verbatim (they tend to carry the
+        topic); later sentences get filler words stripped, and sentences
+        repeating their predecessor are dropped.
+        """
+        out_lines = []
+        prev_key = None
+        for line in transcript.splitlines():
+            kept = []
+            for i, sentence in enumerate(_SENTENCE_SPLIT_RE.split(line)):
+                if i >= 2:
+                    sentence = _FILLER_RE.sub('', sentence).strip()
+                # Compare without the anchor so whisper's repeated-line
+                # hallucinations collapse across timestamps too
+                key = _ANCHOR_RE.sub('', sentence)
+                if not key or key == prev_key:
+                    continue
+                kept.append(sentence)
+                prev_key = key
+            if kept:
+                out_lines.append(" ".join(kept))
+        return "\n".join(out_lines)
+
+    def _condense_if_needed(self, transcript):
+        """
+        Map-reduce pass for transcripts that exceed the context window:
+        summarize each chunk, then let the normal format prompt run over
+        the concatenated chunk summaries instead of the raw transcript.
+        """
+        if len(transcript) > _COMPRESS_THRESHOLD_CHARS:
+            compressed = self._compress_transcript(transcript)
+            logger.info(
+                "Compressed transcript %d -> %d chars",
+                len(transcript), len(compressed)
+            )
+            transcript = compressed
+
+        if self._count_tokens(transcript) <= _MAP_REDUCE_THRESHOLD:
+            return transcript
+
+        chunks = self._chunk_transcript(transcript)
+        logger.info("Transcript exceeds context window; condensing %d chunks", len(chunks))
+
+        parts = []
+        for chunk in chunks:
+            summary = self._call_llm(_PROMPT_CHUNK.format_map({"chunk": chunk}))
+            if summary:
+                parts.append(summary)
+        return "\n\n".join(parts) if parts else transcript
+
+    def generate_summary(self, transcript, meeting_duration_minutes=None, fmt=None):
+        """
+        Generate a meeting summary from transcript.
+
+        Args:
+            transcript: Full meeting transcript text
+            meeting_duration_minutes: Optional meeting duration
+            fmt: Summary format (detailed/bullets/executive/email)
+
+        Returns:
+            Formatted summary as markdown string
+        """
+        # Length and isspace short-circuit without copying the (possibly
+        # hours-long) transcript the way strip() would
+        if not transcript or len(transcript) < 10 or transcript.isspace():
+            return "# Meeting Summary\n\nNo transcript available to summarize."
+
+        fmt = fmt or self.summary_format
+
+        cached = self._cache_get(transcript, fmt)
+        if cached is not None:
+            logger.info("Summary cache hit (%s)", fmt)
+            return cached
+
+        logger.info("Generating %s summary (%d chars)", fmt, len(transcript))
+
+        try:
+            condensed = self._condense_if_needed(transcript)
+            prompt = self._build_summary_prompt(condensed, meeting_duration_minutes, fmt)
+            response = self._call_llm(prompt)
+
+            if response:
+                logger.info("Summary generated successfully")
+                self._cache_put(transcript, fmt, response)
+                return response
+            else:
+                return "# Meeting Summary\n\nFailed to generate summary."
+
+        except Exception as e:
+            logger.error("Summary generation failed: %s", e)
+            return f"# Meeting Summary\n\nError: {e}"
+
+    def generate_summaries(self, transcript, fmts, meeting_duration_minutes=None):
+        """
+        Generate the same transcript in several summary formats.
+
+        The model is loaded once per Summarizer, so this just runs the
+        formats back to back against the resident weights. Generation is
+        compute-bound on a single local model - there is no benefit to
+        overlapping the calls, only to not reloading between them.
+
+        Args:
+            transcript: Full meeting transcript text
+            fmts: Iterable of formats from SUMMARY_FORMATS
+            meeting_duration_minutes: Optional meeting duration
+
+        Returns:
+            Dict mapping format name to summary markdown
+        """
+        return {
+            fmt: self.generate_summary(transcript, meeting_duration_minutes, fmt)
+            for fmt in fmts
+        }
+
+    def generate_summary_stream(self, transcript, meeting_duration_minutes=None, fmt=None):
+        """
+        Generate a meeting summary, yielding text fragments as the LLM
+        produces them.
+
+        Callers can write fragments straight to disk and show progress
+        instead of blocking on the full completion.
+
+        Args:
+            transcript: Full meeting transcript text
+            meeting_duration_minutes: Optional meeting duration
+            fmt: Summary format (detailed/bullets/executive/email)
+
+        Yields:
+            Summary text fragments (markdown)
+        """
+        # Length and isspace short-circuit without copying the (possibly
+        # hours-long) transcript the way strip() would
+        if not transcript or len(transcript) < 10 or transcript.isspace():
+            yield "# Meeting Summary\n\nNo transcript available to summarize."
+            return
+
+        fmt = fmt or self.summary_format
+
+        cached = self._cache_get(transcript, fmt)
+        if cached is not None:
+            logger.info("Summary cache hit (%s)", fmt)
+            yield cached
+            return
+
+        logger.info("Streaming %s summary (%d chars)", fmt, len(transcript))
+
+        fragments = []
+        try:
+            condensed = self._condense_if_needed(transcript)
+            prompt = self._build_summary_prompt(condensed, meeting_duration_minutes, fmt)
+            for chunk in self.llm(
+                prompt,
+                max_tokens=1000,
+                temperature=0.1,
+                top_p=0.85,
+                echo=False,
+                stream=True,
+            ):
+                if not isinstance(chunk, dict):
+                    continue
+                choices = chunk.get('choices')
+                if not choices or not isinstance(choices[0], dict):
+                    continue
+                text = choices[0].get('text')
+                if text:
+                    fragments.append(text)
+                    yield text
+
+        except Exception as e:
+            logger.error("Summary generation failed: %s", e)
+            yield f"\n\n# Meeting Summary\n\nError: {e}"
+            return
+
+        if fragments:
+            self._cache_put(transcript, fmt, "".join(fragments))
+
+    def _build_summary_prompt(self, transcript, duration=None, fmt="detailed"):
+        """Build format-specific prompt for the LLM."""
+        if duration:
+            # The email subject line carries the duration inline
+            duration_text = (
+                f" ({duration} min)" if fmt == "email"
+                else f"\nMeeting Duration: ~{duration} minutes"
+            )
+        else:
+            duration_text = ""
+
+        template = _PROMPT_TEMPLATES.get(fmt, _PROMPT_DETAILED)
+        return template.format_map({
+            "date": _today_str(),
+            "duration_text": duration_text,
+            "transcript": transcript,
+        })
+
     def _call_llm(self, prompt):
         """Call the local LLM model."""
         logger.info("Calling local LLM...")
@@ -229,24 +493,16 @@ RULES: Keep it professional and concise. Only include information from the trans
             echo=False,
         )
 
-        # Defensively validate response structure
-        if not isinstance(response, dict):
-            logger.error("LLM response is not a dict: %s", type(response))
-            logger.error("Raw response: %s", response)
-            return None
-
-        if 'choices' not in response or not isinstance(response['choices'], list) or len(response['choices']) == 0:
-            logger.error("LLM response missing or invalid 'choices' key: %s", response)
-            return None
-
-        choice = response['choices'][0]
-        if not isinstance(choice, dict) or 'text' not in choice:
-            logger.error("LLM choice[0] missing or invalid 'text' key: %s", choice)
+        # llama-cpp-python's return shape is stable; fast-path the access
+        # and let one except arm catch any malformed response
+        try:
+            text = response['choices'][0]['text'].strip()
+        except (KeyError, IndexError, TypeError, AttributeError) as e:
+            logger.error("Unexpected LLM response shape: %s (%r)", e, response)
             return None
 
-        text = choice['text'].strip()
-        if not isinstance(text, str) or not text:
-            logger.error("LLM text is not a non-empty string: %s", text)
+        if not text:
+            logger.error("LLM returned an empty completion")
             return None
 
         return text
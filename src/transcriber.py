@@ -1,10 +1,15 @@
 """
 Speech-to-text using Whisper.cpp
 """
+import os
+import re
 import subprocess
 import tempfile
+import threading
 import wave
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import time
 import logging
@@ -13,11 +18,26 @@ from utils.config import (
     WHISPER_MODEL_PATH,
     WHISPER_EXECUTABLE,
     SAMPLE_RATE,
-    CHANNELS
+    CHANNELS,
+    settings
 )
 
 logger = logging.getLogger(__name__)
 
+# whisper-cli output parsing, compiled once: timestamp lines whose text
+# we keep, diagnostic lines we drop, and whitespace normalization.
+# _TS_LINE is MULTILINE so one findall over the whole stdout extracts
+# every timestamped segment without a Python-level loop per line.
+_TS_LINE = re.compile(r'^\[[^\]\n]*-->[^\]\n]*\][ \t]*(.*?)[ \t]*$', re.MULTILINE)
+_SKIP_LINE = re.compile(
+    r'whisper_init|processing|system info|load time|sample time|encode time',
+    re.IGNORECASE
+)
+_WS = re.compile(r'\s+')
+
+# Wall-clock limit for a single whisper-cli invocation, seconds
+_WHISPER_TIMEOUT = 300
+
 
 class Transcriber:
     """Real-time transcription using Whisper.cpp"""
@@ -31,6 +51,17 @@ class Transcriber:
         if not self.executable.exists():
             raise FileNotFoundError(f"Whisper executable not found: {self.executable}")
 
+        # Seconds of audio consumed by the most recent transcribe_stream
+        # session, so callers can tell how much of the WAV is already covered
+        self.last_stream_seconds = 0.0
+
+        # Scratch WAVs reused across streaming chunks - whisper-cli only
+        # reads files, but there's no need to create and unlink one per
+        # 10s chunk. One per worker thread, since chunks can transcribe
+        # concurrently.
+        self._scratch = threading.local()
+        self._scratch_paths = []
+
         logger.info("Transcriber initialized (model: %s)", self.model_path.name)
 
     def transcribe_file(self, wav_path, language="en"):
@@ -57,59 +88,112 @@ class Transcriber:
             logger.info("Transcribing: %s", wav_path.name if hasattr(wav_path, 'name') else wav_path)
             start_time = time.time()
 
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
-
-            elapsed = time.time() - start_time
-
-            if result.returncode != 0:
-                logger.error("Whisper error: %s", result.stderr)
-                return ""
-
-            output_lines = result.stdout.strip().split('\n')
-
             transcript_lines = []
-            for line in output_lines:
-                if not line.strip():
-                    continue
-
-                # Extract text from timestamp lines
-                if line.startswith('[') and '-->' in line:
-                    bracket_end = line.index(']')
-                    text = line[bracket_end + 1:].strip()
-                    if text:
-                        transcript_lines.append(text)
-                    continue
-
-                # Skip system messages
-                if any(skip in line.lower() for skip in [
-                    'whisper_init', 'processing', 'system info',
-                    'load time', 'sample time', 'encode time'
-                ]):
-                    continue
-
-                clean_line = line.strip()
-                if clean_line and len(clean_line) > 1:
-                    transcript_lines.append(clean_line)
-
-            transcript = ' '.join(transcript_lines)
-            transcript = ' '.join(transcript.split())
+            fallback_lines = []
+
+            # Stream stdout as whisper-cli produces it: parsing overlaps
+            # the decode and peak memory stays one line rather than the
+            # whole transcript. stderr goes to a temp file so a chatty
+            # decoder can never deadlock against an unread pipe.
+            with tempfile.TemporaryFile("w+") as err:
+                proc = subprocess.Popen(
+                    cmd,
+                    stdout=subprocess.PIPE,
+                    stderr=err,
+                    text=True
+                )
+                # The read loop blocks until whisper-cli writes or
+                # exits, so the wall-clock limit lives in a watchdog
+                # that kills a hung process - the loop then sees EOF.
+                timed_out = threading.Event()
+
+                def _kill_hung():
+                    timed_out.set()
+                    proc.kill()
+
+                watchdog = threading.Timer(_WHISPER_TIMEOUT, _kill_hung)
+                watchdog.start()
+                try:
+                    for line in proc.stdout:
+                        m = _TS_LINE.match(line)
+                        if m:
+                            if m.group(1):
+                                transcript_lines.append(m.group(1))
+                        elif not _SKIP_LINE.search(line):
+                            clean_line = line.strip()
+                            if len(clean_line) > 1:
+                                fallback_lines.append(clean_line)
+                    returncode = proc.wait()
+                finally:
+                    watchdog.cancel()
+                    proc.stdout.close()
+                    if proc.poll() is None:
+                        proc.kill()
+                        proc.wait()
+
+                elapsed = time.time() - start_time
+
+                if timed_out.is_set():
+                    logger.error("Transcription timed out for %s", wav_path)
+                    return ""
+
+                if returncode != 0:
+                    err.seek(0)
+                    logger.error("Whisper error: %s", err.read())
+                    return ""
+
+            if not transcript_lines:
+                # No timestamped lines at all - use the filtered
+                # plain-text output instead
+                transcript_lines = fallback_lines
+
+            transcript = _WS.sub(' ', ' '.join(transcript_lines)).strip()
 
             logger.info("Transcribed in %.1fs (%d characters)", elapsed, len(transcript))
 
             return transcript
 
-        except subprocess.TimeoutExpired:
-            logger.error("Transcription timed out for %s", wav_path)
-            return ""
         except Exception as e:
             logger.error("Transcription error: %s", e, exc_info=True)
             return ""
 
+    def transcribe_file_from(self, wav_path, start_seconds):
+        """
+        Transcribe only the portion of a WAV file after start_seconds.
+
+        Used to fill the tail gap when streaming transcription covered
+        most, but not all, of a recording.
+
+        Args:
+            wav_path: Path to WAV file
+            start_seconds: Offset to start transcribing from
+
+        Returns:
+            Transcription text for the uncovered tail (may be empty)
+        """
+        with wave.open(str(wav_path), 'rb') as wf:
+            start_frame = int(start_seconds * wf.getframerate())
+            total_frames = wf.getnframes()
+            if start_frame >= total_frames:
+                return ""
+            wf.setpos(start_frame)
+            tail_frames = wf.readframes(total_frames - start_frame)
+            params = wf.getparams()
+
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
+            temp_path = Path(temp_wav.name)
+
+        try:
+            with wave.open(str(temp_path), 'wb') as out:
+                out.setparams(params)
+                out.writeframes(tail_frames)
+
+            return self.transcribe_file(temp_path)
+
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
     def transcribe_chunk(self, audio_data):
         """
         Transcribe a small audio chunk (for real-time).
@@ -123,52 +207,113 @@ class Transcriber:
         if audio_data is None or len(audio_data) == 0:
             return ""
 
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_wav:
-            temp_path = Path(temp_wav.name)
-
+        scratch = getattr(self._scratch, "wav_path", None)
+        if scratch is None:
+            fd, name = tempfile.mkstemp(prefix="openmeet_chunk_", suffix=".wav")
+            os.close(fd)
+            scratch = Path(name)
+            self._scratch.wav_path = scratch
+            self._scratch_paths.append(scratch)
+
+        with wave.open(str(scratch), 'wb') as wf:
+            wf.setnchannels(CHANNELS)
+            wf.setsampwidth(2)  # 16-bit
+            wf.setframerate(SAMPLE_RATE)
+            wf.writeframes(audio_data.tobytes())
+
+        return self.transcribe_file(scratch)
+
+    def _cleanup_scratch(self):
+        """Remove the streaming scratch WAVs once a session ends."""
+        for path in self._scratch_paths:
             try:
-                with wave.open(str(temp_path), 'wb') as wf:
-                    wf.setnchannels(CHANNELS)
-                    wf.setsampwidth(2)  # 16-bit
-                    wf.setframerate(SAMPLE_RATE)
-                    wf.writeframes(audio_data.tobytes())
-
-                return self.transcribe_file(temp_path)
+                path.unlink()
+            except OSError:
+                pass
+        self._scratch_paths = []
+        self._scratch = threading.local()
 
-            finally:
-                if temp_path.exists():
-                    temp_path.unlink()
-
-    def transcribe_stream(self, audio_capture, callback):
+    def transcribe_stream(self, audio_capture, callback, batch_seconds=None):
         """
         Transcribe audio stream in real-time.
 
+        Captured 10s chunks are accumulated into batches of
+        batch_seconds before each whisper invocation - a bigger window
+        amortizes the fixed per-call cost and gives whisper more
+        context across sentence boundaries, at the cost of live latency.
+
         Args:
             audio_capture: AudioCapture instance
             callback: Function to call with each transcript chunk
+            batch_seconds: Audio per whisper call (default from the
+                whisper_batch_seconds setting)
         """
-        logger.info("Starting real-time transcription (10-second chunks)")
+        if batch_seconds is None:
+            batch_seconds = settings.get("whisper_batch_seconds") or 20
 
-        chunk_count = 0
-
-        while audio_capture.is_recording:
-            audio_chunk = audio_capture.get_audio_chunk(duration_seconds=10)
-
-            if audio_chunk is not None and len(audio_chunk) > 0:
-                chunk_count += 1
-                logger.debug("Processing chunk #%d...", chunk_count)
-
-                transcript = self.transcribe_chunk(audio_chunk)
-
-                if transcript:
-                    callback(transcript)
-                else:
-                    logger.debug("No speech detected in chunk #%d", chunk_count)
-
-            time.sleep(1)
+        logger.info(
+            "Starting real-time transcription (%ds batches)", batch_seconds
+        )
 
+        chunk_count = 0
+        self.last_stream_seconds = 0.0
+        batch = []
+        batch_secs = 0.0
+
+        def submit_batch():
+            nonlocal batch, batch_secs
+            audio = batch[0] if len(batch) == 1 else np.concatenate(batch)
+            pending.append(executor.submit(self.transcribe_chunk, audio))
+            batch = []
+            batch_secs = 0.0
+
+        # Capture keeps pulling chunks while up to two workers transcribe
+        # them; a slow whisper pass no longer stalls the next capture.
+        # Futures are delivered in submission order so the transcript
+        # stays chronological.
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            while audio_capture.is_recording:
+                audio_chunk = audio_capture.get_audio_chunk(duration_seconds=10)
+
+                if audio_chunk is not None and len(audio_chunk) > 0:
+                    chunk_count += 1
+                    self.last_stream_seconds += len(audio_chunk) / SAMPLE_RATE
+                    logger.debug("Captured chunk #%d...", chunk_count)
+                    # The capture buffer is reused across calls - copy
+                    # before accumulating
+                    batch.append(audio_chunk.copy())
+                    batch_secs += len(audio_chunk) / SAMPLE_RATE
+                    if batch_secs >= batch_seconds:
+                        submit_batch()
+
+                # Deliver whatever has finished, in order, without
+                # blocking the capture loop
+                while pending and pending[0].done():
+                    self._deliver(pending.popleft(), callback)
+
+            # Session over - flush the partial batch and drain in order
+            if batch:
+                submit_batch()
+            while pending:
+                self._deliver(pending.popleft(), callback)
+
+        self._cleanup_scratch()
         logger.info("Real-time transcription stopped (%d chunks processed)", chunk_count)
 
+    @staticmethod
+    def _deliver(future, callback):
+        """Hand one finished chunk transcription to the callback."""
+        try:
+            transcript = future.result()
+        except Exception as e:
+            logger.error("Chunk transcription failed: %s", e)
+            return
+        if transcript:
+            callback(transcript)
+        else:
+            logger.debug("No speech detected in chunk")
+
 
 if __name__ == "__main__":
     from utils.logger import setup_logger
@@ -3,73 +3,119 @@ Configuration management for OpenMeet
 """
 import sys
 import os
+import json
+import hashlib
 from pathlib import Path
 from utils.settings import Settings
 from utils.logger import setup_logger, get_logger
 
 
+# Invariant for the process lifetime - compute once instead of
+# re-checking sys attributes at every call site
+_FROZEN = bool(getattr(sys, 'frozen', False))
+
+# Repo root (three levels up), computed once with str ops so repeated
+# calls don't re-allocate intermediate PurePath objects
+_PROJECT_ROOT = Path(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))))
+
+
 def is_frozen():
     """Check if running inside a bundled .app (PyInstaller or py2app)."""
-    return getattr(sys, 'frozen', False)
+    return _FROZEN
 
 
 def get_resources_dir():
     """Return the directory containing read-only bundled resources."""
-    if is_frozen():
+    if _FROZEN:
         # PyInstaller stores resources in sys._MEIPASS
         # py2app uses RESOURCEPATH env var
         return Path(getattr(sys, '_MEIPASS', os.environ.get(
             'RESOURCEPATH',
             str(Path(sys.executable).parent.parent / 'Resources')
         )))
-    return Path(__file__).parent.parent.parent
+    return _PROJECT_ROOT
 
 
 def get_app_data_dir():
     """Return a writable directory for user data."""
-    if is_frozen():
+    if _FROZEN:
         d = Path.home() / "Library" / "Application Support" / "OpenMeet"
         d.mkdir(parents=True, exist_ok=True)
         return d
-    return Path(__file__).parent.parent.parent
+    return _PROJECT_ROOT
 
 
 # Directories — read-only resources vs writable user data
 RESOURCES_DIR = get_resources_dir()
 APP_DATA_DIR = get_app_data_dir()
 
-SRC_DIR = RESOURCES_DIR / "src" if not is_frozen() else RESOURCES_DIR
+SRC_DIR = RESOURCES_DIR / "src" if not _FROZEN else RESOURCES_DIR
 DATA_DIR = APP_DATA_DIR / "data"
 TRANSCRIPTS_DIR = DATA_DIR / "transcripts"
 LOGS_DIR = APP_DATA_DIR / "logs"
 WHISPER_DIR = RESOURCES_DIR / "whisper.cpp"
 
-# Create directories if they don't exist
-TRANSCRIPTS_DIR.mkdir(parents=True, exist_ok=True)
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
+# The settings singleton (and everything derived from it - logger setup,
+# model paths) is built lazily on first access via the module __getattr__
+# below, so importing this module just for a constant like SAMPLE_RATE
+# skips the dotenv parse, settings JSON read, and logger wiring.
+_runtime_ready = False
+
+
+def _load_runtime():
+    """Construct the settings-dependent globals on first access."""
+    global _runtime_ready, settings, logger, LOG_FILE
+    global WHISPER_MODEL_PATH, LLM_MODEL_PATH
+
+    if _runtime_ready:
+        return
+
+    settings = Settings()
+
+    # Create data directories if they don't exist. isdir is one stat on
+    # every warm start; the mkdir chain only runs on first launch.
+    for d in (TRANSCRIPTS_DIR, LOGS_DIR):
+        if not os.path.isdir(d):
+            d.mkdir(parents=True, exist_ok=True)
+
+    LOG_FILE = LOGS_DIR / "openmeet.log"
+    setup_logger("root", log_file=LOG_FILE, level=settings.get("log_level"))
+    logger = get_logger(__name__)
+
+    # Whisper model path is dynamic based on settings
+    WHISPER_MODEL_PATH = WHISPER_DIR / "models" / f"ggml-{settings.get('whisper_model')}.bin"
+
+    # LLM model (bundled) - only construct path if model name is configured
+    llm_model_name = settings.get("llm_model")
+    LLM_MODEL_PATH = RESOURCES_DIR / "models" / llm_model_name if llm_model_name else None
+
+    _runtime_ready = True
+
+
+_LAZY_NAMES = frozenset((
+    "settings", "logger", "LOG_FILE", "WHISPER_MODEL_PATH", "LLM_MODEL_PATH"
+))
+
 
-# Settings singleton
-settings = Settings()
+def __getattr__(name):
+    # PEP 562: called for module attributes not found in globals()
+    if name in _LAZY_NAMES:
+        _load_runtime()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Initialize root logger
-LOG_FILE = LOGS_DIR / "openmeet.log"
-setup_logger("root", log_file=LOG_FILE, level=settings.get("log_level"))
-logger = get_logger(__name__)
 
-# Whisper settings (dynamic based on settings)
-WHISPER_MODEL_PATH = WHISPER_DIR / "models" / f"ggml-{settings.get('whisper_model')}.bin"
 WHISPER_EXECUTABLE = WHISPER_DIR / "build" / "bin" / "whisper-cli"
 
 # Audio settings
 SAMPLE_RATE = 16000  # Whisper prefers 16kHz
 CHANNELS = 1  # Mono
+# Keep this an exact power of two so it matches the hardware period and
+# PortAudio never resizes its host buffers mid-stream
 CHUNK_SIZE = 1024
 CHUNK_DURATION = 10  # seconds
 
-# LLM settings (bundled model) - only construct path if model name is configured
-llm_model_name = settings.get("llm_model")
-LLM_MODEL_PATH = RESOURCES_DIR / "models" / llm_model_name if llm_model_name else None
-
 # UI settings
 TRANSCRIPT_WINDOW_WIDTH = 500
 TRANSCRIPT_WINDOW_HEIGHT = 600
@@ -77,23 +123,75 @@ SUMMARY_WINDOW_WIDTH = 700
 SUMMARY_WINDOW_HEIGHT = 800
 
 
-def validate_setup():
+# Generated summaries are cached by content hash so re-summarizing an
+# identical transcript (re-runs, format already generated) skips the LLM
+SUMMARY_CACHE_DIR = DATA_DIR / "summary_cache"
+
+# Successful validation is cached keyed by a hash of the watched files,
+# so a packaged app launched at login doesn't re-stat everything each boot
+VALIDATE_CACHE_FILE = DATA_DIR / "validate_cache.json"
+
+
+def _setup_stamp():
+    """Hash of (path, size, mtime) for every file validate_setup checks."""
+    _load_runtime()
+    watched = [WHISPER_MODEL_PATH, WHISPER_EXECUTABLE]
+    if LLM_MODEL_PATH is not None:
+        watched.append(LLM_MODEL_PATH)
+
+    parts = []
+    for path in watched:
+        try:
+            st = os.stat(path)
+            parts.append((str(path), st.st_size, st.st_mtime_ns))
+        except OSError:
+            parts.append((str(path), None, None))
+
+    return hashlib.blake2b(repr(parts).encode()).hexdigest()
+
+
+def _dir_names(parent):
+    """Entry names in parent, or an empty set if it doesn't exist.
+
+    One scandir per directory replaces an exists() stat per file and
+    warms the dentry cache for the loads that follow validation.
+    """
+    try:
+        with os.scandir(parent) as it:
+            return {entry.name for entry in it}
+    except OSError:
+        return set()
+
+
+def validate_setup(use_cache=True):
     """Check if all required components are installed"""
+    _load_runtime()
+    stamp = _setup_stamp() if use_cache else None
+
+    if use_cache:
+        try:
+            with open(VALIDATE_CACHE_FILE, 'r') as f:
+                if json.load(f).get("stamp") == stamp:
+                    logger.debug("Setup unchanged since last validation; skipping checks")
+                    return True
+        except (OSError, json.JSONDecodeError, AttributeError):
+            pass
+
     errors = []
 
-    if not WHISPER_MODEL_PATH.exists():
+    if WHISPER_MODEL_PATH.name not in _dir_names(WHISPER_MODEL_PATH.parent):
         model_name = settings.get("whisper_model")
         errors.append(f"Whisper model not found at {WHISPER_MODEL_PATH}")
         errors.append(f"  Run: cd whisper.cpp && bash ./models/download-ggml-model.sh {model_name}")
 
-    if not WHISPER_EXECUTABLE.exists():
+    if WHISPER_EXECUTABLE.name not in _dir_names(WHISPER_EXECUTABLE.parent):
         errors.append(f"Whisper executable not found at {WHISPER_EXECUTABLE}")
         errors.append("  Run: cd whisper.cpp && mkdir build && cd build && cmake .. && cmake --build . --config Release")
 
     if LLM_MODEL_PATH is None:
         errors.append("LLM model not configured (llm_model is missing from settings)")
         errors.append("  Configure llm_model in settings or set OPENMEET_LLM_MODEL environment variable")
-    elif not LLM_MODEL_PATH.exists():
+    elif LLM_MODEL_PATH.name not in _dir_names(LLM_MODEL_PATH.parent):
         errors.append(f"LLM model not found at {LLM_MODEL_PATH}")
         errors.append(f"  Download a GGUF model into the models/ directory")
 
@@ -104,6 +202,14 @@ def validate_setup():
         return False
 
     logger.info("All components validated successfully!")
+
+    if use_cache:
+        try:
+            with open(VALIDATE_CACHE_FILE, 'w') as f:
+                json.dump({"stamp": stamp}, f)
+        except OSError:
+            pass
+
     return True
 
 
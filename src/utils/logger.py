@@ -1,15 +1,32 @@
 """
 Centralized logging for OpenMeet
 """
+import atexit
+import functools
 import logging
+import logging.handlers
+import queue
 import sys
 from pathlib import Path
 
+# Level names resolved via one dict lookup instead of getattr + upper
+_LEVEL_MAP = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
 
 def setup_logger(name, log_file=None, level="INFO"):
     """
     Create and configure a logger instance.
 
+    Log records are routed through a QueueHandler so hot threads (the
+    audio callback, the transcription worker) only pay a queue.put per
+    record; a QueueListener thread does the actual stream/file writes.
+
     Args:
         name: Logger name (typically __name__)
         log_file: Optional path to log file
@@ -20,7 +37,7 @@ def setup_logger(name, log_file=None, level="INFO"):
     """
     # Use root logger so all modules inherit handlers
     logger = logging.getLogger() if name == "root" else logging.getLogger(name)
-    logger.setLevel(getattr(logging, level.upper(), logging.INFO))
+    logger.setLevel(_LEVEL_MAP.get(level.upper(), logging.INFO))
 
     if logger.handlers:
         return logger
@@ -32,7 +49,7 @@ def setup_logger(name, log_file=None, level="INFO"):
         "[%(asctime)s] %(levelname)s %(name)s: %(message)s",
         datefmt="%H:%M:%S"
     ))
-    logger.addHandler(console)
+    handlers = [console]
 
     # File handler
     if log_file:
@@ -43,11 +60,26 @@ def setup_logger(name, log_file=None, level="INFO"):
         fh.setFormatter(logging.Formatter(
             "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s"
         ))
-        logger.addHandler(fh)
+        handlers.append(fh)
+
+    # Emitters only enqueue; the listener thread owns the real handlers
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
 
     return logger
 
 
+@functools.lru_cache(maxsize=None)
 def get_logger(name):
-    """Get an existing logger by name."""
+    """Get an existing logger by name.
+
+    Cached so repeated lookups skip the lock logging.getLogger takes
+    around its manager dict.
+    """
     return logging.getLogger(name)
@@ -8,15 +8,31 @@ import os
 from pathlib import Path
 from dotenv import load_dotenv
 
+try:
+    import orjson
+except ImportError:  # optional speedup - stdlib json works fine
+    orjson = None
+
+
+# Invariant for the process lifetime - compute once instead of
+# re-checking sys attributes at every call site
+_FROZEN = bool(getattr(sys, 'frozen', False))
+_PLATFORM = sys.platform
+
+# Repo root (three levels up), computed once with str ops so repeated
+# calls don't re-allocate intermediate PurePath objects
+_PROJECT_ROOT = Path(os.path.dirname(os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__)))))
+
 
 def _get_data_root():
     """Writable directory for user data (settings, transcripts)."""
-    if getattr(sys, 'frozen', False):
+    if _FROZEN:
         # Cross-platform data directory selection
-        if sys.platform == 'darwin':
+        if _PLATFORM == 'darwin':
             # macOS
             d = Path.home() / "Library" / "Application Support" / "OpenMeet"
-        elif sys.platform == 'win32':
+        elif _PLATFORM == 'win32':
             # Windows - use APPDATA if available, else LocalAppData
             appdata = os.environ.get('APPDATA')
             if appdata:
@@ -32,25 +48,63 @@ def _get_data_root():
                 d = Path.home() / ".local" / "share" / "OpenMeet"
         d.mkdir(parents=True, exist_ok=True)
         return d
-    return Path(__file__).parent.parent.parent
+    return _PROJECT_ROOT
 
 
 def _get_resources_root():
     """Read-only directory for bundled resources."""
-    if getattr(sys, 'frozen', False):
+    if _FROZEN:
         # PyInstaller: sys._MEIPASS, py2app: RESOURCEPATH env var
         return Path(getattr(sys, '_MEIPASS', os.environ.get('RESOURCEPATH', '.')))
-    return Path(__file__).parent.parent.parent
+    return _PROJECT_ROOT
 
 
 DATA_ROOT = _get_data_root()
 RESOURCES_ROOT = _get_resources_root()
 
-# .env: check user data dir first, fall back to bundled
-ENV_PATH = DATA_ROOT / ".env" if (DATA_ROOT / ".env").exists() else RESOURCES_ROOT / ".env"
 SETTINGS_FILE = DATA_ROOT / "data" / "settings.json"
 
-load_dotenv(ENV_PATH)
+
+def _load_env_file():
+    """Load .env overrides: user data dir first, fall back to bundled.
+
+    Opens each candidate directly instead of exists()-then-load, so the
+    common case costs one open() syscall rather than a stat + re-open.
+    Deferred to first Settings construction - importing this module
+    never pays for the dotenv parse.
+    """
+    for candidate in (DATA_ROOT / ".env", RESOURCES_ROOT / ".env"):
+        try:
+            with open(candidate) as f:
+                load_dotenv(stream=f)
+            return candidate
+        except OSError:
+            continue
+    return DATA_ROOT / ".env"
+
+
+ENV_PATH = DATA_ROOT / ".env"
+
+
+def _to_bool(val):
+    return val.lower() in ('true', '1', 'yes', 'on')
+
+
+# (env var, setting key, coercion) - built once so each Settings
+# construction is just a tight loop of environ lookups
+_ENV_MAP = (
+    ("OPENMEET_WHISPER_MODEL", "whisper_model", str),
+    ("OPENMEET_LANGUAGE", "language", str),
+    ("OPENMEET_SUMMARY_FORMAT", "summary_format", str),
+    ("OPENMEET_LLM_MODEL", "llm_model", str),
+    ("OPENMEET_LOG_LEVEL", "log_level", str),
+    ("HUGGINGFACE_TOKEN", "huggingface_token", str),
+    ("OPENMEET_DIARIZATION_ENABLED", "diarization_enabled", _to_bool),
+    ("OPENMEET_METAL_OFFLOAD", "metal_offload", _to_bool),
+    ("OPENMEET_LLM_N_GPU_LAYERS", "llm_n_gpu_layers", int),
+    ("OPENMEET_LLM_N_BATCH", "llm_n_batch", int),
+    ("OPENMEET_LLM_USE_MLOCK", "llm_use_mlock", _to_bool),
+)
 
 
 class Settings:
@@ -59,52 +113,76 @@ class Settings:
     DEFAULTS = {
         "audio_device_index": None,
         "whisper_model": "base",
+        # Seconds of audio accumulated per whisper invocation during
+        # streaming; larger = better accuracy and less per-call overhead,
+        # at the cost of live-transcript latency
+        "whisper_batch_seconds": 20,
         "language": "en",
         "summary_format": "detailed",
         "diarization_enabled": False,
         "huggingface_token": "",
         "llm_model": "Llama-3.2-3B-Instruct-Q4_K_M.gguf",
+        "metal_offload": True,
+        # None = auto (all layers on Metal when metal_offload, else CPU)
+        "llm_n_gpu_layers": None,
+        "llm_n_batch": 256,
+        "llm_use_mlock": False,
         "log_level": "INFO",
     }
 
+    # Settings are process-global and construction parses JSON + env,
+    # so repeated Settings() calls reuse the first instance
+    _instance = None
+    _dotenv_loaded = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
     def __init__(self):
+        if hasattr(self, "_settings"):
+            return
+        if not Settings._dotenv_loaded:
+            global ENV_PATH
+            ENV_PATH = _load_env_file()
+            Settings._dotenv_loaded = True
         self._settings = dict(self.DEFAULTS)
         self._load_from_file()
         self._apply_env_overrides()
 
     def _load_from_file(self):
         """Load persisted settings from JSON."""
-        if SETTINGS_FILE.exists():
-            try:
-                with open(SETTINGS_FILE, 'r') as f:
-                    saved = json.load(f)
-                # Migrate from legacy 'ollama_model' to 'llm_model' if needed
-                if "ollama_model" in saved and ("llm_model" not in saved or not saved["llm_model"]):
-                    saved["llm_model"] = saved["ollama_model"]
-                    print(f"Migrating legacy setting 'ollama_model' to 'llm_model': {saved['llm_model']}")
-                self._settings.update(saved)
-            except (json.JSONDecodeError, IOError):
-                pass
+        try:
+            # Open directly rather than exists()-then-read: one syscall
+            # in the common case, ENOENT handles the missing file
+            raw = SETTINGS_FILE.read_bytes()
+            saved = orjson.loads(raw) if orjson is not None else json.loads(raw)
+            # Migrate from legacy 'ollama_model' to 'llm_model' if needed
+            if "ollama_model" in saved and ("llm_model" not in saved or not saved["llm_model"]):
+                saved["llm_model"] = saved["ollama_model"]
+                print(f"Migrating legacy setting 'ollama_model' to 'llm_model': {saved['llm_model']}")
+            # Literal keys (DEFAULTS, _ENV_MAP) are interned by the
+            # compiler; JSON-decoded keys are not. Interning them keeps
+            # every get() lookup on the pointer-equality fast path.
+            self._settings.update(
+                (sys.intern(k), v) for k, v in saved.items()
+            )
+        except (ValueError, OSError):
+            # ValueError covers both json and orjson decode errors
+            pass
 
     def _apply_env_overrides(self):
         """.env variables override saved settings."""
-        env_map = {
-            "OPENMEET_WHISPER_MODEL": "whisper_model",
-            "OPENMEET_LANGUAGE": "language",
-            "OPENMEET_SUMMARY_FORMAT": "summary_format",
-            "OPENMEET_LLM_MODEL": "llm_model",
-            "OPENMEET_LOG_LEVEL": "log_level",
-            "HUGGINGFACE_TOKEN": "huggingface_token",
-            "OPENMEET_DIARIZATION_ENABLED": "diarization_enabled",
-        }
-        for env_key, setting_key in env_map.items():
-            val = os.environ.get(env_key)
+        environ_get = os.environ.get
+        for env_key, setting_key, coerce in _ENV_MAP:
+            val = environ_get(env_key)
             if val is not None:
-                # Handle boolean environment variables
-                if setting_key == "diarization_enabled":
-                    self._settings[setting_key] = val.lower() in ('true', '1', 'yes', 'on')
-                else:
-                    self._settings[setting_key] = val
+                try:
+                    self._settings[setting_key] = coerce(val)
+                except ValueError:
+                    # e.g. a non-numeric value for an int setting
+                    pass
 
     def get(self, key):
         return self._settings.get(key, self.DEFAULTS.get(key))
@@ -115,8 +193,13 @@ class Settings:
     def save(self):
         """Persist current settings to JSON."""
         SETTINGS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(self._settings, f, indent=2)
+        if orjson is not None:
+            SETTINGS_FILE.write_bytes(
+                orjson.dumps(self._settings, option=orjson.OPT_INDENT_2)
+            )
+        else:
+            with open(SETTINGS_FILE, 'w') as f:
+                json.dump(self._settings, f, indent=2)
 
     def all(self):
         return dict(self._settings)
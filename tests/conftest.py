@@ -1,14 +1,25 @@
 """
 Shared pytest fixtures for OpenMeet tests
 """
-import sys
 import pytest
 import numpy as np
-from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-# Ensure src is on path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+# src is on the import path via pythonpath in pytest.ini
+
+
+# Fake device records, built once - the fixture runs per test and the
+# old side_effect lambda rebuilt both dicts on every lookup
+_FAKE_DEVICES = (
+    {
+        'index': 0, 'name': 'MacBook Pro Microphone',
+        'maxInputChannels': 1, 'defaultSampleRate': 16000.0
+    },
+    {
+        'index': 1, 'name': 'External Mic',
+        'maxInputChannels': 2, 'defaultSampleRate': 44100.0
+    },
+)
 
 
 @pytest.fixture
@@ -16,35 +27,26 @@ def mock_pyaudio():
     """Mock PyAudio for audio_capture tests"""
     with patch("pyaudio.PyAudio") as mock:
         instance = MagicMock()
-        instance.get_device_count.return_value = 2
-        instance.get_default_input_device_info.return_value = {
-            'index': 0,
-            'name': 'MacBook Pro Microphone',
-            'maxInputChannels': 1,
-            'defaultSampleRate': 16000.0
-        }
-        instance.get_device_info_by_index.side_effect = lambda i: {
-            0: {
-                'index': 0, 'name': 'MacBook Pro Microphone',
-                'maxInputChannels': 1, 'defaultSampleRate': 16000.0
-            },
-            1: {
-                'index': 1, 'name': 'External Mic',
-                'maxInputChannels': 2, 'defaultSampleRate': 44100.0
-            },
-        }[i]
+        instance.get_device_count.return_value = len(_FAKE_DEVICES)
+        instance.get_default_input_device_info.return_value = _FAKE_DEVICES[0]
+        instance.get_device_info_by_index.side_effect = _FAKE_DEVICES.__getitem__
         instance.get_sample_size.return_value = 2
         instance.open.return_value = MagicMock()
         mock.return_value = instance
         yield instance
 
 
-@pytest.fixture
-def mock_whisper_paths(tmp_path):
-    """Create fake whisper model and executable paths"""
-    model = tmp_path / "ggml-tiny.bin"
+@pytest.fixture(scope="session")
+def mock_whisper_paths(tmp_path_factory):
+    """Create fake whisper model and executable paths.
+
+    Session-scoped: no test mutates the files, so two tiny writes per
+    session replace two per test.
+    """
+    whisper_dir = tmp_path_factory.mktemp("whisper")
+    model = whisper_dir / "ggml-tiny.bin"
     model.write_text("fake model")
-    exe = tmp_path / "whisper-cli"
+    exe = whisper_dir / "whisper-cli"
     exe.write_text("fake exe")
     exe.chmod(0o755)
     return model, exe
@@ -61,6 +63,8 @@ def mock_llm(tmp_path):
     mock_llama_instance.return_value = {
         'choices': [{'text': '# Meeting Summary\n\n## Overview\nTest summary content.'}]
     }
+    # Roughly 4 chars per token, like the real tokenizer
+    mock_llama_instance.tokenize.side_effect = lambda b: [0] * (len(b) // 4)
 
     mock_llama_class = MagicMock(return_value=mock_llama_instance)
 
@@ -68,11 +72,23 @@ def mock_llm(tmp_path):
     mock_module.Llama = mock_llama_class
 
     with patch.dict('sys.modules', {'llama_cpp': mock_module}), \
-         patch('summarizer.LLM_MODEL_PATH', fake_model):
+         patch('summarizer.LLM_MODEL_PATH', fake_model), \
+         patch('summarizer.SUMMARY_CACHE_DIR', tmp_path / "summary_cache"):
         yield mock_llama_instance
 
 
 @pytest.fixture
+def summarizer(mock_llm):
+    """A Summarizer wired to the mocked LLM.
+
+    Function-scoped on purpose: the summary cache directory and the
+    mock's call counts must not leak between tests.
+    """
+    from summarizer import Summarizer
+    return Summarizer()
+
+
+@pytest.fixture(scope="session")
 def sample_transcript():
     """Sample transcript text for testing"""
     return (
@@ -82,7 +98,7 @@ def sample_transcript():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_whisper_output():
     """Sample whisper-cli stdout output"""
     return (
@@ -94,7 +110,13 @@ def sample_whisper_output():
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def audio_chunk():
-    """Generate a fake audio chunk (1 second of silence at 16kHz)"""
-    return np.zeros(16000, dtype=np.int16)
+    """Generate a fake audio chunk (1 second of silence at 16kHz)
+
+    Session-scoped and read-only: the buffer is shared across tests,
+    so accidental mutation raises instead of leaking between them.
+    """
+    chunk = np.zeros(16000, dtype=np.int16)
+    chunk.setflags(write=False)
+    return chunk
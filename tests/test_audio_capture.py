@@ -3,24 +3,28 @@ Tests for audio_capture.py
 """
 import pytest
 import numpy as np
-import queue
 from unittest.mock import patch, MagicMock
 from datetime import datetime
 
+import audio_capture as audio_capture_module
+from audio_capture import AudioCapture
+
+# 1024 samples of 16-bit silence; bytes(n) is a single C-level memset,
+# cheaper than building a numpy array and copying it out with tobytes()
+_SILENT_CHUNK = bytes(2048)
+
 
 class TestAudioCaptureInit:
     """Test AudioCapture initialization"""
 
     def test_initializes_pyaudio(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         assert ac.audio is not None
 
     def test_initial_state(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         assert ac.is_recording is False
-        assert ac.frames == []
+        assert len(ac._write_queue) == 0
         assert ac.current_session_id is None
         assert ac.stream is None
 
@@ -29,7 +33,6 @@ class TestListDevices:
     """Test device listing"""
 
     def test_returns_device_list(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         devices = ac.list_audio_devices()
         assert len(devices) == 2
@@ -37,7 +40,6 @@ class TestListDevices:
         assert devices[1]['name'] == 'External Mic'
 
     def test_device_has_required_keys(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         devices = ac.list_audio_devices()
         for d in devices:
@@ -51,14 +53,12 @@ class TestFindInputDevice:
     """Test input device detection"""
 
     def test_returns_default_device_index(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         idx = ac.find_input_device()
         assert idx == 0
 
     def test_returns_none_on_error(self, mock_pyaudio):
         mock_pyaudio.get_default_input_device_info.side_effect = Exception("No device")
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         idx = ac.find_input_device()
         assert idx is None
@@ -68,14 +68,12 @@ class TestGetAudioChunk:
     """Test audio chunk retrieval from queue"""
 
     def test_returns_numpy_array_when_data_available(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         ac.is_recording = True
 
         # Put some fake audio data in the queue
-        chunk = np.zeros(1024, dtype=np.int16).tobytes()
         for _ in range(10):
-            ac.audio_queue.put(chunk)
+            ac._audio_callback(_SILENT_CHUNK, 1024, None, None)
 
         result = ac.get_audio_chunk(duration_seconds=0.5)
         assert result is not None
@@ -83,7 +81,6 @@ class TestGetAudioChunk:
         assert result.dtype == np.int16
 
     def test_returns_none_when_no_data_and_not_recording(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         ac.is_recording = False
         result = ac.get_audio_chunk(duration_seconds=0.1)
@@ -93,37 +90,41 @@ class TestGetAudioChunk:
 class TestSessionId:
     """Test session ID generation"""
 
+    @pytest.fixture(autouse=True)
+    def _transcripts_dir(self, monkeypatch, tmp_path):
+        # start_recording opens the session WAV up front - point it at
+        # tmp_path so test runs don't litter the real data/transcripts
+        monkeypatch.setattr(audio_capture_module, "TRANSCRIPTS_DIR", tmp_path)
+
     def test_session_id_format(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
 
         # Mock start_recording enough to set session_id
         with patch.object(ac, 'find_input_device', return_value=0):
             ac.start_recording()
 
-        assert ac.current_session_id is not None
-        # Format: YYYYMMDD_HHMMSS
-        assert len(ac.current_session_id) == 15
-        assert ac.current_session_id[8] == '_'
+            assert ac.current_session_id is not None
+            # Format: YYYYMMDD_HHMMSS
+            assert len(ac.current_session_id) == 15
+            assert ac.current_session_id[8] == '_'
 
-        # Cleanup
-        ac.is_recording = False
+            # Join the writer thread and close the WAV handle
+            ac.stop_recording()
 
     def test_new_session_id_per_recording(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
 
         with patch.object(ac, 'find_input_device', return_value=0):
             ac.start_recording()
             id1 = ac.current_session_id
-            ac.is_recording = False
+            ac.stop_recording()
 
             import time
             time.sleep(1.1)
 
             ac.start_recording()
             id2 = ac.current_session_id
-            ac.is_recording = False
+            ac.stop_recording()
 
         assert id1 != id2
 
@@ -132,7 +133,6 @@ class TestCleanup:
     """Test resource cleanup"""
 
     def test_cleanup_terminates_pyaudio(self, mock_pyaudio):
-        from audio_capture import AudioCapture
         ac = AudioCapture()
         ac.cleanup()
         mock_pyaudio.terminate.assert_called_once()
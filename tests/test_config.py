@@ -5,29 +5,41 @@ import pytest
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
+# Imported once per collection rather than once per test method; the
+# settings import triggers the lazy runtime init (dirs, model paths)
+import utils.config as config
+from utils.config import (
+    RESOURCES_DIR,
+    TRANSCRIPTS_DIR,
+    LOGS_DIR,
+    WHISPER_MODEL_PATH,
+    SAMPLE_RATE,
+    CHANNELS,
+    CHUNK_SIZE,
+    settings,
+    validate_setup,
+    _setup_stamp,
+)
+
 
 class TestConfigPaths:
     """Test path constants"""
 
     def test_resources_dir_is_valid_directory(self):
-        from utils.config import RESOURCES_DIR
         assert RESOURCES_DIR.exists()
         assert RESOURCES_DIR.is_dir()
 
     def test_transcripts_dir_exists(self):
-        from utils.config import TRANSCRIPTS_DIR
+        # Data dirs are created on first runtime access, not at import
         assert TRANSCRIPTS_DIR.exists()
 
     def test_logs_dir_exists(self):
-        from utils.config import LOGS_DIR
         assert LOGS_DIR.exists()
 
     def test_whisper_model_path_has_bin_extension(self):
-        from utils.config import WHISPER_MODEL_PATH
         assert WHISPER_MODEL_PATH.suffix == ".bin"
 
     def test_whisper_model_path_contains_model_name(self):
-        from utils.config import WHISPER_MODEL_PATH, settings
         model_name = settings.get("whisper_model")
         assert model_name in WHISPER_MODEL_PATH.name
 
@@ -36,15 +48,12 @@ class TestAudioSettings:
     """Test audio configuration constants"""
 
     def test_sample_rate(self):
-        from utils.config import SAMPLE_RATE
         assert SAMPLE_RATE == 16000
 
     def test_channels_mono(self):
-        from utils.config import CHANNELS
         assert CHANNELS == 1
 
     def test_chunk_size(self):
-        from utils.config import CHUNK_SIZE
         assert CHUNK_SIZE == 1024
 
 
@@ -52,17 +61,14 @@ class TestSettings:
     """Test Settings singleton"""
 
     def test_settings_has_defaults(self):
-        from utils.config import settings
         assert settings.get("whisper_model") is not None
         assert settings.get("language") is not None
         assert settings.get("summary_format") is not None
 
     def test_settings_get_unknown_key_returns_none(self):
-        from utils.config import settings
         assert settings.get("nonexistent_key_xyz") is None
 
     def test_settings_set_and_get(self):
-        from utils.config import settings
         original = settings.get("language")
         settings.set("language", "fr")
         assert settings.get("language") == "fr"
@@ -70,7 +76,6 @@ class TestSettings:
         settings.set("language", original)
 
     def test_settings_all_returns_dict(self):
-        from utils.config import settings
         all_settings = settings.all()
         assert isinstance(all_settings, dict)
         assert "whisper_model" in all_settings
@@ -80,6 +85,21 @@ class TestValidateSetup:
     """Test setup validation"""
 
     def test_validate_setup_returns_bool(self):
-        from utils.config import validate_setup
         result = validate_setup()
         assert isinstance(result, bool)
+
+    def test_validate_setup_without_cache_returns_bool(self):
+        result = validate_setup(use_cache=False)
+        assert isinstance(result, bool)
+
+    def test_stamp_is_stable_and_hex(self):
+        stamp = _setup_stamp()
+        assert stamp == _setup_stamp()
+        int(stamp, 16)  # valid hex digest
+
+    def test_corrupt_cache_file_is_tolerated(self, tmp_path):
+        bad_cache = tmp_path / "validate_cache.json"
+        bad_cache.write_text("not json{")
+        with patch("utils.config.VALIDATE_CACHE_FILE", bad_cache):
+            result = config.validate_setup()
+        assert isinstance(result, bool)
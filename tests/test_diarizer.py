@@ -2,7 +2,7 @@
 Tests for diarizer.py - static methods only (no ML models needed)
 """
 import pytest
-from diarizer import Diarizer
+from diarizer import Diarizer, SpeakerIndex, SpeakerTurns
 
 
 class TestParseWhisperTimestamps:
@@ -66,6 +66,52 @@ class TestParseWhisperTimestamps:
         assert segments[1][2] == "Runtime format"
 
 
+class TestIncrementalParse:
+    """Test the grow-only incremental parser"""
+
+    def test_matches_full_parse(self):
+        part1 = "[00:00:00.000 --> 00:00:03.000]   Hello\n"
+        part2 = "[00:00:03.000 --> 00:00:06.000]   World\n"
+
+        d = Diarizer()
+        d.parse_whisper_timestamps_incremental(part1)
+        segments = d.parse_whisper_timestamps_incremental(part1 + part2)
+        assert segments == Diarizer.parse_whisper_timestamps(part1 + part2)
+
+    def test_only_scans_new_suffix(self):
+        transcript = "[00:00:00.000 --> 00:00:03.000]   Hello\n"
+
+        d = Diarizer()
+        d.parse_whisper_timestamps_incremental(transcript)
+        offset = d._parse_offset
+        assert offset == len(transcript)
+        # Unchanged input is not rescanned
+        assert d.parse_whisper_timestamps_incremental(transcript) == [
+            (0.0, 3.0, "Hello")
+        ]
+        assert d._parse_offset == offset
+
+    def test_partial_last_line_deferred(self):
+        complete = "[00:00:00.000 --> 00:00:03.000]   Hello\n"
+        partial = "[00:00:03.000 --> 00:0"
+
+        d = Diarizer()
+        segments = d.parse_whisper_timestamps_incremental(complete + partial)
+        assert len(segments) == 1
+        segments = d.parse_whisper_timestamps_incremental(
+            complete + "[00:00:03.000 --> 00:00:06.000]   World\n"
+        )
+        assert len(segments) == 2
+
+    def test_resets_on_replaced_transcript(self):
+        d = Diarizer()
+        d.parse_whisper_timestamps_incremental(
+            "[00:00:00.000 --> 00:00:03.000]   Long first transcript line\n"
+        )
+        segments = d.parse_whisper_timestamps_incremental("[10:00:00] New\n")
+        assert segments == [(36000.0, 36010.0, "New")]
+
+
 class TestAlignSpeakers:
     """Test temporal overlap alignment"""
 
@@ -101,6 +147,23 @@ class TestAlignSpeakers:
         result = Diarizer.align_speakers_with_transcript(speakers, [])
         assert result == []
 
+    def test_accepts_speaker_turns(self):
+        speakers = SpeakerTurns.from_tuples(
+            [(0.0, 5.0, "Speaker 1"), (5.0, 10.0, "Speaker 2")]
+        )
+        transcript = [(0.0, 5.0, "Hello"), (5.0, 10.0, "World")]
+
+        result = Diarizer.align_speakers_with_transcript(speakers, transcript)
+        assert result == [("Speaker 1", "Hello"), ("Speaker 2", "World")]
+
+    def test_speaker_turns_from_tuples_preserves_labels(self):
+        turns = SpeakerTurns.from_tuples(
+            [(0.0, 1.0, "A"), (1.0, 2.0, "B"), (2.0, 3.0, "A")]
+        )
+        assert len(turns) == 3
+        assert turns.labels == ["A", "B"]
+        assert list(turns.label_idx) == [0, 1, 0]
+
     def test_multiple_speakers_multiple_segments(self):
         speakers = [
             (0.0, 3.0, "Speaker 1"),
@@ -119,6 +182,31 @@ class TestAlignSpeakers:
         assert result[2] == ("Speaker 1", "Third part")
 
 
+class TestSpeakerIndex:
+    """Test the reusable interval index behind alignment"""
+
+    def test_align_one_picks_best_overlap(self):
+        index = SpeakerIndex([(0.0, 4.0, "Speaker 1"), (4.0, 10.0, "Speaker 2")])
+        assert index.align_one(3.0, 7.0) == "Speaker 2"
+        assert index.align_one(0.0, 2.0) == "Speaker 1"
+
+    def test_align_one_returns_none_outside_all_turns(self):
+        index = SpeakerIndex([(0.0, 5.0, "Speaker 1")])
+        assert index.align_one(10.0, 15.0) is None
+        assert index.align_one(5.0, 6.0) is None  # touching, zero overlap
+
+    def test_index_reusable_across_queries(self):
+        speakers = [(0.0, 3.0, "A"), (3.0, 6.0, "B"), (6.0, 9.0, "A")]
+        index = SpeakerIndex(speakers)
+        labels = [index.align_one(s, e) for s, e in ((0.0, 3.0), (3.0, 6.0), (6.0, 9.0))]
+        assert labels == ["A", "B", "A"]
+
+    def test_unsorted_input_is_handled(self):
+        index = SpeakerIndex([(5.0, 10.0, "Speaker 2"), (0.0, 5.0, "Speaker 1")])
+        assert index.align_one(1.0, 2.0) == "Speaker 1"
+        assert index.align_one(6.0, 7.0) == "Speaker 2"
+
+
 class TestDiarizerInit:
     """Test Diarizer initialization (without loading models)"""
 
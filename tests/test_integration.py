@@ -2,10 +2,28 @@
 Integration tests - test full pipeline with mocked external dependencies
 """
 import pytest
-import numpy as np
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
+from audio_capture import AudioCapture
+from transcriber import Transcriber
+from summarizer import Summarizer, SUMMARY_FORMATS
+from diarizer import Diarizer
+
+# 1024 samples of 16-bit silence, built once per collection instead of
+# a numpy allocation + tobytes copy inside every pipeline test
+_ZERO_CHUNK_BYTES = bytes(2048)
+
+
+def _fake_proc(output, returncode=0):
+    """A Popen stand-in whose stdout streams the given whisper output."""
+    import io
+    proc = MagicMock()
+    proc.stdout = io.StringIO(output)
+    proc.wait.return_value = returncode
+    proc.poll.return_value = returncode
+    return proc
+
 
 class TestTranscriptionPipeline:
     """Test audio -> transcription flow"""
@@ -15,16 +33,12 @@ class TestTranscriptionPipeline:
 
         with patch("transcriber.WHISPER_MODEL_PATH", model), \
              patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from audio_capture import AudioCapture
-            from transcriber import Transcriber
-
             # Set up audio capture with fake data in queue
             ac = AudioCapture()
             ac.is_recording = True
 
-            chunk = np.zeros(1024, dtype=np.int16).tobytes()
             for _ in range(20):
-                ac.audio_queue.put(chunk)
+                ac._audio_callback(_ZERO_CHUNK_BYTES, 1024, None, None)
 
             # Get audio chunk
             audio_data = ac.get_audio_chunk(duration_seconds=0.5)
@@ -35,10 +49,8 @@ class TestTranscriptionPipeline:
             t = Transcriber()
             whisper_output = "[00:00:00.000 --> 00:00:05.000]   Test transcription output\n"
 
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(
-                    returncode=0, stdout=whisper_output, stderr=""
-                )
+            with patch("subprocess.Popen") as mock_popen:
+                mock_popen.return_value = _fake_proc(whisper_output)
                 transcript = t.transcribe_chunk(audio_data)
 
             assert "Test transcription output" in transcript
@@ -48,7 +60,6 @@ class TestSummarizationPipeline:
     """Test transcript -> summary flow"""
 
     def test_transcript_to_summary(self, mock_llm, sample_transcript):
-        from summarizer import Summarizer
         s = Summarizer()
 
         summary = s.generate_summary(sample_transcript)
@@ -57,7 +68,6 @@ class TestSummarizationPipeline:
         assert "Meeting Summary" in summary
 
     def test_all_summary_formats_work(self, mock_llm, sample_transcript):
-        from summarizer import Summarizer, SUMMARY_FORMATS
         s = Summarizer()
 
         for fmt in SUMMARY_FORMATS:
@@ -70,8 +80,6 @@ class TestDiarizationPipeline:
     """Test transcript -> diarization alignment flow (no ML models)"""
 
     def test_parse_and_align(self):
-        from diarizer import Diarizer
-
         transcript = (
             "[00:00:00.000 --> 00:00:05.000]   Hello everyone\n"
             "[00:00:05.000 --> 00:00:10.000]   Let's get started\n"
@@ -108,16 +116,11 @@ class TestFullPipeline:
 
         with patch("transcriber.WHISPER_MODEL_PATH", model), \
              patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from audio_capture import AudioCapture
-            from transcriber import Transcriber
-            from summarizer import Summarizer
-
             # 1. Audio capture produces data
             ac = AudioCapture()
             ac.is_recording = True
-            chunk = np.zeros(1024, dtype=np.int16).tobytes()
             for _ in range(20):
-                ac.audio_queue.put(chunk)
+                ac._audio_callback(_ZERO_CHUNK_BYTES, 1024, None, None)
             audio_data = ac.get_audio_chunk(duration_seconds=0.5)
             assert audio_data is not None
 
@@ -127,10 +130,8 @@ class TestFullPipeline:
                 "[00:00:00.000 --> 00:00:05.000]   Hello everyone\n"
                 "[00:00:05.000 --> 00:00:10.000]   Meeting discussion\n"
             )
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(
-                    returncode=0, stdout=whisper_output, stderr=""
-                )
+            with patch("subprocess.Popen") as mock_popen:
+                mock_popen.return_value = _fake_proc(whisper_output)
                 transcript = t.transcribe_chunk(audio_data)
             assert len(transcript) > 0
 
@@ -146,15 +147,10 @@ class TestFullPipeline:
 
         with patch("transcriber.WHISPER_MODEL_PATH", model), \
              patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            from summarizer import Summarizer
-
             # Empty transcription
             t = Transcriber()
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(
-                    returncode=0, stdout="", stderr=""
-                )
+            with patch("subprocess.Popen") as mock_popen:
+                mock_popen.return_value = _fake_proc("")
                 transcript = t.transcribe_file(Path("empty.wav"))
             assert transcript == ""
 
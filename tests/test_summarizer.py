@@ -4,20 +4,19 @@ Tests for summarizer.py
 import pytest
 from unittest.mock import patch, MagicMock
 
+from summarizer import Summarizer
+
 
 class TestSummarizerInit:
     """Test Summarizer initialization"""
 
-    def test_init_success(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        assert s.llm is not None
-        assert s.model_path is not None
+    def test_init_success(self, summarizer):
+        assert summarizer.llm is not None
+        assert summarizer.model_path is not None
 
     def test_init_raises_when_model_missing(self, tmp_path):
         missing_model = tmp_path / "nonexistent.gguf"
         with patch("summarizer.LLM_MODEL_PATH", missing_model):
-            from summarizer import Summarizer
             with pytest.raises(RuntimeError):
                 Summarizer()
 
@@ -25,53 +24,37 @@ class TestSummarizerInit:
 class TestBuildSummaryPrompt:
     """Test prompt building"""
 
-    def test_detailed_prompt_contains_transcript(self, mock_llm, sample_transcript):
-        from summarizer import Summarizer
-        s = Summarizer()
-        prompt = s._build_summary_prompt(sample_transcript, fmt="detailed")
+    def test_detailed_prompt_contains_transcript(self, summarizer, sample_transcript):
+        prompt = summarizer._build_summary_prompt(sample_transcript, fmt="detailed")
         assert "Hello everyone" in prompt
         assert "project status" in prompt
 
-    def test_detailed_prompt_contains_date(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        prompt = s._build_summary_prompt("test transcript", fmt="detailed")
+    def test_detailed_prompt_contains_date(self, summarizer):
+        prompt = summarizer._build_summary_prompt("test transcript", fmt="detailed")
         assert "202" in prompt  # Year
 
-    def test_prompt_includes_duration(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        prompt = s._build_summary_prompt("test", duration=30, fmt="detailed")
+    def test_prompt_includes_duration(self, summarizer):
+        prompt = summarizer._build_summary_prompt("test", duration=30, fmt="detailed")
         assert "30 minutes" in prompt
 
-    def test_prompt_excludes_duration_when_none(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        prompt = s._build_summary_prompt("test", duration=None, fmt="detailed")
+    def test_prompt_excludes_duration_when_none(self, summarizer):
+        prompt = summarizer._build_summary_prompt("test", duration=None, fmt="detailed")
         assert "minutes" not in prompt
 
-    def test_bullets_format(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        prompt = s._build_summary_prompt("test", fmt="bullets")
+    def test_bullets_format(self, summarizer):
+        prompt = summarizer._build_summary_prompt("test", fmt="bullets")
         assert "bullet-point" in prompt.lower() or "Key Points" in prompt
 
-    def test_executive_format(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        prompt = s._build_summary_prompt("test", fmt="executive")
+    def test_executive_format(self, summarizer):
+        prompt = summarizer._build_summary_prompt("test", fmt="executive")
         assert "executive" in prompt.lower() or "Executive Brief" in prompt
 
-    def test_email_format(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        prompt = s._build_summary_prompt("test", fmt="email")
+    def test_email_format(self, summarizer):
+        prompt = summarizer._build_summary_prompt("test", fmt="email")
         assert "email" in prompt.lower() or "recap" in prompt.lower()
 
-    def test_unknown_format_falls_back_to_detailed(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        prompt = s._build_summary_prompt("test", fmt="nonexistent")
+    def test_unknown_format_falls_back_to_detailed(self, summarizer):
+        prompt = summarizer._build_summary_prompt("test", fmt="nonexistent")
         # Should use detailed format (contains structured sections)
         assert "Overview" in prompt
 
@@ -79,59 +62,158 @@ class TestBuildSummaryPrompt:
 class TestCallLLM:
     """Test local LLM calling"""
 
-    def test_successful_llm_call(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        result = s._call_llm("test prompt")
+    def test_successful_llm_call(self, summarizer):
+        result = summarizer._call_llm("test prompt")
         assert result is not None
         assert "Meeting Summary" in result
 
-    def test_returns_none_on_empty_response(self, mock_llm):
+    def test_returns_none_on_empty_response(self, mock_llm, summarizer):
         mock_llm.return_value = {'choices': [{'text': '   '}]}
-        from summarizer import Summarizer
-        s = Summarizer()
-        result = s._call_llm("test")
+        result = summarizer._call_llm("test")
         assert result is None
 
-    def test_handles_llm_exception(self, mock_llm):
+    def test_handles_llm_exception(self, mock_llm, summarizer):
         mock_llm.side_effect = Exception("Out of memory")
-        from summarizer import Summarizer
-        s = Summarizer()
         # _call_llm should propagate the exception (caught by generate_summary)
         with pytest.raises(Exception):
-            s._call_llm("test")
+            summarizer._call_llm("test")
 
 
 class TestGenerateSummary:
     """Test full summary generation"""
 
-    def test_short_transcript_returns_placeholder(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        result = s.generate_summary("hi")
+    def test_short_transcript_returns_placeholder(self, summarizer):
+        result = summarizer.generate_summary("hi")
         assert "No transcript available" in result
 
-    def test_empty_transcript_returns_placeholder(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        result = s.generate_summary("")
+    def test_empty_transcript_returns_placeholder(self, summarizer):
+        result = summarizer.generate_summary("")
         assert "No transcript available" in result
 
-    def test_none_transcript_returns_placeholder(self, mock_llm):
-        from summarizer import Summarizer
-        s = Summarizer()
-        result = s.generate_summary(None)
+    def test_none_transcript_returns_placeholder(self, summarizer):
+        result = summarizer.generate_summary(None)
         assert "No transcript available" in result
 
-    def test_valid_transcript_calls_llm(self, mock_llm, sample_transcript):
-        from summarizer import Summarizer
-        s = Summarizer()
-        result = s.generate_summary(sample_transcript)
+    def test_valid_transcript_calls_llm(self, summarizer, sample_transcript):
+        result = summarizer.generate_summary(sample_transcript)
         assert "Meeting Summary" in result
 
-    def test_format_parameter_passed_through(self, mock_llm, sample_transcript):
-        from summarizer import Summarizer
-        s = Summarizer()
+    def test_format_parameter_passed_through(self, summarizer, sample_transcript):
         # Should not raise
-        result = s.generate_summary(sample_transcript, fmt="bullets")
+        result = summarizer.generate_summary(sample_transcript, fmt="bullets")
         assert result is not None
+
+
+class TestMapReduce:
+    """Test long-transcript chunking and condensation"""
+
+    def _long_transcript(self):
+        return " ".join(f"Speaker says thing number {i} in the meeting." for i in range(400))
+
+    def test_chunk_transcript_bounds_chunks(self, summarizer):
+        chunks = summarizer._chunk_transcript(self._long_transcript(), max_tokens=200)
+        assert len(chunks) > 1
+        # chars/4 heuristic applies under the mocked tokenizer
+        assert all(len(c) // 4 <= 250 for c in chunks)
+
+    def test_short_transcript_not_condensed(self, mock_llm, summarizer, sample_transcript):
+        assert summarizer._condense_if_needed(sample_transcript) == sample_transcript
+        mock_llm.assert_not_called()
+
+    def test_long_transcript_summarized_per_chunk(self, mock_llm, summarizer):
+        summarizer.generate_summary(self._long_transcript())
+        # One call per chunk plus the final format pass
+        assert mock_llm.call_count > 2
+
+
+class TestCompressTranscript:
+    """Test the text-level transcript compression"""
+
+    def test_keeps_first_sentences_verbatim(self):
+        line = (
+            "[10:00:00] We decided to ship. The date is Friday. "
+            "So um we should you know get started."
+        )
+        result = Summarizer._compress_transcript(line)
+        assert "We decided to ship." in result
+        assert "The date is Friday." in result
+        assert "um" not in result
+        assert "you know" not in result
+
+    def test_drops_repeated_sentences(self):
+        transcript = (
+            "[10:00:00] Hello everyone. Hello everyone.\n"
+            "[10:00:10] Hello everyone. Something new."
+        )
+        result = Summarizer._compress_transcript(transcript)
+        # Repeats collapse even across timestamp anchors
+        assert result.count("Hello everyone.") == 1
+        assert "Something new." in result
+
+    def test_short_transcripts_bypass_compression(self, summarizer, sample_transcript):
+        assert summarizer._condense_if_needed(sample_transcript) == sample_transcript
+
+
+class TestSummaryCache:
+    """Test the exact-match summary cache"""
+
+    def test_repeat_summary_skips_llm(self, mock_llm, summarizer, sample_transcript):
+        first = summarizer.generate_summary(sample_transcript)
+        mock_llm.reset_mock()
+        assert summarizer.generate_summary(sample_transcript) == first
+        mock_llm.assert_not_called()
+
+    def test_cache_is_format_specific(self, mock_llm, summarizer, sample_transcript):
+        summarizer.generate_summary(sample_transcript, fmt="detailed")
+        mock_llm.reset_mock()
+        summarizer.generate_summary(sample_transcript, fmt="bullets")
+        mock_llm.assert_called_once()
+
+    def test_stream_hits_cache_from_blocking_call(self, mock_llm, summarizer, sample_transcript):
+        first = summarizer.generate_summary(sample_transcript)
+        mock_llm.reset_mock()
+        assert "".join(summarizer.generate_summary_stream(sample_transcript)) == first
+        mock_llm.assert_not_called()
+
+    def test_errors_are_not_cached(self, mock_llm, summarizer, sample_transcript):
+        mock_llm.side_effect = Exception("Out of memory")
+        result = summarizer.generate_summary(sample_transcript)
+        assert "Error" in result
+        mock_llm.side_effect = None
+        mock_llm.reset_mock()
+        summarizer.generate_summary(sample_transcript)
+        mock_llm.assert_called_once()
+
+
+class TestGenerateSummaries:
+    """Test multi-format generation"""
+
+    def test_returns_summary_per_format(self, summarizer, sample_transcript):
+        results = summarizer.generate_summaries(sample_transcript, ("detailed", "bullets"))
+        assert set(results) == {"detailed", "bullets"}
+        for summary in results.values():
+            assert "Meeting Summary" in summary
+
+
+class TestGenerateSummaryStream:
+    """Test streaming summary generation"""
+
+    def test_yields_fragments_in_order(self, mock_llm, summarizer, sample_transcript):
+        mock_llm.return_value = [
+            {'choices': [{'text': '# Meeting '}]},
+            {'choices': [{'text': 'Summary'}]},
+        ]
+        fragments = list(summarizer.generate_summary_stream(sample_transcript))
+        assert "".join(fragments) == "# Meeting Summary"
+
+    def test_short_transcript_yields_placeholder(self, summarizer):
+        fragments = list(summarizer.generate_summary_stream("hi"))
+        assert "No transcript available" in "".join(fragments)
+
+    def test_skips_malformed_chunks(self, mock_llm, summarizer, sample_transcript):
+        mock_llm.return_value = [
+            "not a dict",
+            {'choices': []},
+            {'choices': [{'text': 'ok'}]},
+        ]
+        assert "".join(summarizer.generate_summary_stream(sample_transcript)) == "ok"
@@ -1,67 +1,79 @@
 """
 Tests for transcriber.py
 """
+import io
 import pytest
 import numpy as np
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 
+import transcriber as transcriber_module
+from transcriber import Transcriber
+
+
+def _fake_proc(output, returncode=0):
+    """A Popen stand-in whose stdout streams the given whisper output."""
+    proc = MagicMock()
+    proc.stdout = io.StringIO(output)
+    proc.wait.return_value = returncode
+    proc.poll.return_value = returncode
+    return proc
+
+
+@pytest.fixture(autouse=True)
+def _whisper_globals(monkeypatch, mock_whisper_paths):
+    """Point transcriber's module globals at the fake whisper paths.
+
+    monkeypatch teardown is a plain setattr per attribute, much lighter
+    than the mock.patch context machinery the tests used to stack.
+    """
+    model, exe = mock_whisper_paths
+    monkeypatch.setattr(transcriber_module, "WHISPER_MODEL_PATH", model)
+    monkeypatch.setattr(transcriber_module, "WHISPER_EXECUTABLE", exe)
+
+
+@pytest.fixture
+def transcriber():
+    """A Transcriber built against the fake whisper paths."""
+    return Transcriber()
+
 
 class TestTranscriberInit:
     """Test Transcriber initialization"""
 
-    def test_init_with_valid_paths(self, mock_whisper_paths):
+    def test_init_with_valid_paths(self, mock_whisper_paths, transcriber):
         model, exe = mock_whisper_paths
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
-            assert t.model_path == model
-            assert t.executable == exe
-
-    def test_init_raises_on_missing_model(self, tmp_path):
-        missing = tmp_path / "nonexistent.bin"
-        exe = tmp_path / "whisper-cli"
-        exe.write_text("fake")
-        with patch("transcriber.WHISPER_MODEL_PATH", missing), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            with pytest.raises(FileNotFoundError, match="model"):
-                Transcriber()
-
-    def test_init_raises_on_missing_executable(self, tmp_path):
-        model = tmp_path / "ggml-tiny.bin"
-        model.write_text("fake")
-        missing = tmp_path / "nonexistent"
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", missing):
-            from transcriber import Transcriber
-            with pytest.raises(FileNotFoundError, match="executable"):
-                Transcriber()
+        assert transcriber.model_path == model
+        assert transcriber.executable == exe
+
+    def test_init_raises_on_missing_model(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(
+            transcriber_module, "WHISPER_MODEL_PATH", tmp_path / "nonexistent.bin"
+        )
+        with pytest.raises(FileNotFoundError, match="model"):
+            Transcriber()
+
+    def test_init_raises_on_missing_executable(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(
+            transcriber_module, "WHISPER_EXECUTABLE", tmp_path / "nonexistent"
+        )
+        with pytest.raises(FileNotFoundError, match="executable"):
+            Transcriber()
 
 
 class TestTranscriberParsing:
     """Test the output parsing logic in transcribe_file"""
 
-    def test_parses_timestamp_lines(self, mock_whisper_paths, sample_whisper_output):
-        model, exe = mock_whisper_paths
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
-
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(
-                    returncode=0, stdout=sample_whisper_output, stderr=""
-                )
-                result = t.transcribe_file(Path("test.wav"))
-
-            assert "Hello everyone" in result
-            assert "project status" in result
-            assert "meeting adjourned" in result
-
-    def test_filters_system_messages(self, mock_whisper_paths):
-        model, exe = mock_whisper_paths
+    def test_parses_timestamp_lines(self, transcriber, sample_whisper_output):
+        with patch("subprocess.Popen") as mock_popen:
+            mock_popen.return_value = _fake_proc(sample_whisper_output)
+            result = transcriber.transcribe_file(Path("test.wav"))
+
+        assert "Hello everyone" in result
+        assert "project status" in result
+        assert "meeting adjourned" in result
+
+    def test_filters_system_messages(self, transcriber):
         whisper_output = (
             "whisper_init_from_file: loading model\n"
             "system info: test\n"
@@ -69,96 +81,155 @@ class TestTranscriberParsing:
             "processing: done\n"
             "load time = 100ms\n"
         )
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
-
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(
-                    returncode=0, stdout=whisper_output, stderr=""
-                )
-                result = t.transcribe_file(Path("test.wav"))
-
-            assert result == "Actual text"
-            assert "whisper_init" not in result
-            assert "system info" not in result
-            assert "processing" not in result
-
-    def test_handles_empty_output(self, mock_whisper_paths):
-        model, exe = mock_whisper_paths
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
+        with patch("subprocess.Popen") as mock_popen:
+            mock_popen.return_value = _fake_proc(whisper_output)
+            result = transcriber.transcribe_file(Path("test.wav"))
 
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(
-                    returncode=0, stdout="", stderr=""
-                )
-                result = t.transcribe_file(Path("test.wav"))
+        assert result == "Actual text"
+        assert "whisper_init" not in result
+        assert "system info" not in result
+        assert "processing" not in result
 
-            assert result == ""
+    def test_handles_empty_output(self, transcriber):
+        with patch("subprocess.Popen") as mock_popen:
+            mock_popen.return_value = _fake_proc("")
+            result = transcriber.transcribe_file(Path("test.wav"))
 
-    def test_handles_whisper_error(self, mock_whisper_paths):
-        model, exe = mock_whisper_paths
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
+        assert result == ""
 
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(
-                    returncode=1, stdout="", stderr="error occurred"
-                )
-                result = t.transcribe_file(Path("test.wav"))
+    def test_handles_whisper_error(self, transcriber):
+        with patch("subprocess.Popen") as mock_popen:
+            mock_popen.return_value = _fake_proc("", returncode=1)
+            result = transcriber.transcribe_file(Path("test.wav"))
 
-            assert result == ""
+        assert result == ""
 
-    def test_handles_subprocess_timeout(self, mock_whisper_paths):
+    def test_handles_subprocess_timeout(self, transcriber, monkeypatch):
+        # Real hung process, real watchdog: whisper-cli is replaced by a
+        # python that sleeps and writes nothing, so the read loop blocks
+        # until the watchdog kills it.
         import subprocess
-        model, exe = mock_whisper_paths
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
+        import sys
+        monkeypatch.setattr(transcriber_module, "_WHISPER_TIMEOUT", 0.2)
+        real_popen = subprocess.Popen
+
+        def hung_popen(cmd, **kwargs):
+            return real_popen(
+                [sys.executable, "-c", "import time; time.sleep(30)"], **kwargs
+            )
+
+        with patch("subprocess.Popen", side_effect=hung_popen):
+            result = transcriber.transcribe_file(Path("test.wav"))
+
+        assert result == ""
+
 
-            with patch("subprocess.run") as mock_run:
-                mock_run.side_effect = subprocess.TimeoutExpired(cmd="whisper", timeout=300)
-                result = t.transcribe_file(Path("test.wav"))
+class TestTranscribeFileFrom:
+    """Test partial (tail) transcription"""
 
-            assert result == ""
+    def _make_wav(self, path, seconds=2, rate=16000):
+        import wave
+        with wave.open(str(path), 'wb') as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(rate)
+            wf.writeframes(np.zeros(rate * seconds, dtype=np.int16).tobytes())
+
+    def test_start_past_end_returns_empty(self, transcriber, tmp_path):
+        wav = tmp_path / "test.wav"
+        self._make_wav(wav, seconds=1)
+        assert transcriber.transcribe_file_from(wav, start_seconds=5) == ""
+
+    def test_transcribes_tail_only(self, transcriber, tmp_path):
+        wav = tmp_path / "test.wav"
+        self._make_wav(wav, seconds=2)
+
+        with patch.object(transcriber, "transcribe_file", return_value="tail text") as mock_tf:
+            result = transcriber.transcribe_file_from(wav, start_seconds=1)
+
+        assert result == "tail text"
+        # The temp file passed on should contain only the 1s tail
+        call_path = mock_tf.call_args[0][0]
+        assert str(call_path).endswith(".wav")
+
+
+class TestTranscribeStream:
+    """Test the overlapped streaming loop"""
+
+    class FakeCapture:
+        def __init__(self, chunks):
+            self._chunks = list(chunks)
+            self.is_recording = True
+
+        def get_audio_chunk(self, duration_seconds=10):
+            if not self._chunks:
+                self.is_recording = False
+                return None
+            return self._chunks.pop(0)
+
+    def test_chunks_delivered_in_order(self, transcriber):
+        capture = self.FakeCapture(
+            np.full(16000, i, dtype=np.int16) for i in range(3)
+        )
+        results = []
+        with patch.object(
+            transcriber, "transcribe_chunk", side_effect=lambda a: f"chunk {int(a[0])}"
+        ):
+            transcriber.transcribe_stream(capture, results.append, batch_seconds=1)
+
+        assert results == ["chunk 0", "chunk 1", "chunk 2"]
+        assert transcriber.last_stream_seconds == 3.0
+
+    def test_failed_chunk_does_not_stop_stream(self, transcriber):
+        capture = self.FakeCapture(
+            np.full(16000, i, dtype=np.int16) for i in range(2)
+        )
+        outputs = iter([Exception("whisper crashed"), "ok"])
+
+        def transcribe(audio):
+            result = next(outputs)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        results = []
+        with patch.object(transcriber, "transcribe_chunk", side_effect=transcribe):
+            transcriber.transcribe_stream(capture, results.append, batch_seconds=1)
+
+        assert results == ["ok"]
+
+    def test_chunks_batched_before_whisper(self, transcriber):
+        capture = self.FakeCapture(
+            np.full(16000, i, dtype=np.int16) for i in range(4)
+        )
+        seen = []
+
+        def transcribe(audio):
+            seen.append(len(audio))
+            return "text"
+
+        results = []
+        with patch.object(transcriber, "transcribe_chunk", side_effect=transcribe):
+            transcriber.transcribe_stream(capture, results.append, batch_seconds=2)
+
+        # Four 1s chunks, batched two at a time
+        assert seen == [32000, 32000]
+        assert results == ["text", "text"]
 
 
 class TestTranscribeChunk:
     """Test transcribe_chunk method"""
 
-    def test_returns_empty_for_none_input(self, mock_whisper_paths):
-        model, exe = mock_whisper_paths
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
-            assert t.transcribe_chunk(None) == ""
+    def test_returns_empty_for_none_input(self, transcriber):
+        assert transcriber.transcribe_chunk(None) == ""
 
-    def test_returns_empty_for_empty_array(self, mock_whisper_paths):
-        model, exe = mock_whisper_paths
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
-            assert t.transcribe_chunk(np.array([], dtype=np.int16)) == ""
+    def test_returns_empty_for_empty_array(self, transcriber):
+        assert transcriber.transcribe_chunk(np.array([], dtype=np.int16)) == ""
 
-    def test_creates_temp_wav_and_transcribes(self, mock_whisper_paths, audio_chunk):
-        model, exe = mock_whisper_paths
-        with patch("transcriber.WHISPER_MODEL_PATH", model), \
-             patch("transcriber.WHISPER_EXECUTABLE", exe):
-            from transcriber import Transcriber
-            t = Transcriber()
-
-            with patch.object(t, "transcribe_file", return_value="hello world") as mock_tf:
-                result = t.transcribe_chunk(audio_chunk)
-                assert result == "hello world"
-                # Verify transcribe_file was called with a temp path
-                call_path = mock_tf.call_args[0][0]
-                assert str(call_path).endswith(".wav")
+    def test_creates_temp_wav_and_transcribes(self, transcriber, audio_chunk):
+        with patch.object(transcriber, "transcribe_file", return_value="hello world") as mock_tf:
+            result = transcriber.transcribe_chunk(audio_chunk)
+            assert result == "hello world"
+            # Verify transcribe_file was called with a temp path
+            call_path = mock_tf.call_args[0][0]
+            assert str(call_path).endswith(".wav")